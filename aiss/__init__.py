@@ -1,7 +1,32 @@
 """AISS - AI Security Screener"""
+from typing import TYPE_CHECKING, Any
 
-from .core.scanner import SecurityScanner
-from .core.config import AISSConfig
-from .core.models import Finding, SeverityLevel
+__version__ = "0.1.0"
 
-__version__ = "0.1.0"
\ No newline at end of file
+# Public names are resolved on first access (PEP 562) so importing the
+# package, e.g. for the CLI entry point, does not load aiohttp or pydantic
+_LAZY_ATTRS = {
+    "SecurityScanner": ".core.scanner",
+    "AISSConfig": ".core.config",
+    "Finding": ".core.models",
+    "SeverityLevel": ".core.models",
+}
+
+__all__ = ["SecurityScanner", "AISSConfig", "Finding", "SeverityLevel", "__version__"]
+
+if TYPE_CHECKING:
+    from .core.scanner import SecurityScanner
+    from .core.config import AISSConfig
+    from .core.models import Finding, SeverityLevel
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -1,13 +1,27 @@
 """
 AISS CLI interface
+
+Only click is imported at module level. Scanner, HTTP, config and rich
+modules are imported by the commands that need them, and plotly only
+when an HTML report is rendered, so ``aiss --help`` and JSON scans start
+fast (see tests/test_startup.py for the budget).
 """
 import click
-import asyncio
-from rich.console import Console
-from typing import Optional
-from ..core.scanner import SecurityScanner
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from ..core.config import AISSConfig
+    from ..reporting.history import HistoryStore
+
+SEVERITY_NAMES = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO')
 
-console = Console()
+@lru_cache(maxsize=None)
+def _console() -> 'Console':
+    from rich.console import Console
+    return Console()
 
 @click.group()
 def cli():
@@ -20,53 +34,337 @@ def cli():
               help='Type of agent to test')
 @click.option('--agent-id', help='Agent ID for Moltbook/OpenClaw agents')
 @click.option('--output', '-o', help='Output file for results')
-@click.option('--format', '-f', type=click.Choice(['text', 'json', 'html']), default='text')
-def scan(target: Optional[str], type: str, agent_id: str, output: str, format: str):
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'html', 'ndjson']), default='text',
+              help='Report format; ndjson streams one finding per line as it is found')
+@click.option('--targets-file', type=click.Path(exists=True, dir_okay=False),
+              help='File of target URLs or agent IDs (plain text or JSONL) for a fleet scan')
+@click.option('--concurrency', type=int, help='Fleet scan: targets scanned at the same time')
+@click.option('--per-host', type=int, help='Fleet scan: targets per host scanned at the same time')
+@click.option('--workers', type=int, help='Fleet scan: worker processes (0 = one per CPU)')
+@click.option('--cache/--no-cache', default=None, help='Reuse cached probe responses')
+@click.option('--cache-ttl', type=int, help='Cached response lifetime in seconds (enables the cache)')
+@click.option('--history/--no-history', 'record_history', default=None,
+              help='Record results in the history database')
+@click.option('--record', type=click.Path(dir_okay=False),
+              help='Append every probe and response to this cassette file')
+@click.option('--replay', type=click.Path(exists=True, dir_okay=False),
+              help='Serve probes from a recorded cassette instead of the network')
+@click.option('--module', '-m', 'modules', multiple=True,
+              help='Only run this test module (repeatable; see `aiss modules`)')
+def scan(target: Optional[str], type: str, agent_id: str, output: str, format: str,
+         targets_file: Optional[str], concurrency: Optional[int], per_host: Optional[int],
+         workers: Optional[int], cache: Optional[bool], cache_ttl: Optional[int],
+         record_history: Optional[bool], record: Optional[str], replay: Optional[str],
+         modules: tuple):
     """Scan an AI agent for security issues"""
+    import asyncio
+    from ..core.config import AISSConfig
+    from ..core.fleet import resolve_agent_target
+    from ..core.scanner import SecurityScanner
+
     try:
+        config = AISSConfig.load()
+        if cache_ttl is not None:
+            config.scan.cache_enabled = True
+            config.scan.cache_ttl = cache_ttl
+        if cache is not None:
+            config.scan.cache_enabled = cache
+        if record_history is not None:
+            config.history.enabled = record_history
+        if modules:
+            config.scan.modules = list(modules)
+        if record and replay:
+            raise click.UsageError("--record and --replay cannot be combined")
+        if record or replay:
+            config.scan.cassette_mode = 'record' if record else 'replay'
+            config.scan.cassette_path = record or replay
+
+        if targets_file:
+            if concurrency:
+                config.fleet.concurrency = concurrency
+            if per_host:
+                config.fleet.per_host_concurrency = per_host
+            if workers is not None:
+                config.fleet.workers = workers
+            _scan_fleet(targets_file, type, output, config)
+            return
+
         if not target and not agent_id:
             if type == 'moltbook':
-                console.print("[red]Error: Need --agent-id for Moltbook agents[/red]")
+                _console().print("[red]Error: Need --agent-id for Moltbook agents[/red]")
                 return
             elif type == 'openclaw':
-                console.print("[yellow]No target specified, switching to self-check mode[/yellow]")
-                self_check()
+                _console().print("[yellow]No target specified, switching to self-check mode[/yellow]")
+                _self_check(config, [], format if format != 'ndjson' else 'text', output)
                 return
             else:
-                console.print("[red]Error: Need either target URL or --agent-id[/red]")
+                _console().print("[red]Error: Need either target URL or --agent-id[/red]")
                 return
 
         # Construct proper target URL
-        if type == 'moltbook' and agent_id:
-            target = f"https://www.moltbook.com/agents/{agent_id}"
-        elif type == 'openclaw' and agent_id:
-            # Use OpenClaw's agent endpoint
-            target = f"http://localhost:3000/agents/{agent_id}"
+        if type in ('moltbook', 'openclaw') and agent_id:
+            target = resolve_agent_target(type, agent_id)
+
+        if format == 'ndjson':
+            _scan_streaming(target, config, output)
+            return
 
-        scanner = SecurityScanner(target)
+        scanner = SecurityScanner(target, config)
         results = asyncio.run(scanner.run_scan())
-        
-        # Generate and save/display report
-        # ... (rest of the reporting logic)
+        if config.history.enabled:
+            with _history(config) as history:
+                history.record_results(results)
+        _write_report(results, config, format, output)
 
     except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        _console().print(f"[bold red]Error:[/bold red] {str(e)}")
+
+def _history(config: 'AISSConfig', path: Optional[str] = None) -> 'HistoryStore':
+    from ..reporting.history import HistoryStore
+    return HistoryStore(path or config.history.path, batch_size=config.history.batch_size)
+
+def _write_report(results: Dict[str, Any], config: 'AISSConfig', format: str,
+                  output: Optional[str]) -> None:
+    """Render scan results in the requested format and save or print them"""
+    from ..reporting.generator import ReportGenerator
+
+    config.report.output_format = format
+    metadata = {key: value for key, value in results.items() if key != "findings"}
+    metadata["summary"] = {level.value: count for level, count in results["summary"].items()}
+    report = ReportGenerator(config.report).generate(results["findings"], metadata)
+    if output:
+        with open(output, 'w') as f:
+            f.write(report)
+    elif format != 'text':
+        # The text report has already been printed to the console
+        click.echo(report)
+
+def _scan_streaming(target: str, config: 'AISSConfig', output: Optional[str]) -> None:
+    """Scan one target, writing each finding as an NDJSON line as soon as it is found"""
+    import asyncio
+    from datetime import datetime
+    from ..core.scanner import SecurityScanner
+    from ..reporting.stream import NDJSONWriter
+
+    out = open(output, 'w') if output else sys.stdout
+    history = _history(config) if config.history.enabled else None
+    try:
+        writer = NDJSONWriter(out, include_proof=config.report.include_proof)
+        writer.header(target=target, timestamp=datetime.utcnow().isoformat())
+        on_finding = writer.finding
+        if history is not None:
+            scan_id = history.begin_scan("scan")
+            history.record_target(scan_id, target)
+
+            def on_finding(finding):
+                writer.finding(finding)
+                history.add_finding(scan_id, finding, target)
+
+        scanner = SecurityScanner(target, config, on_finding=on_finding)
+        results = asyncio.run(scanner.run_scan())
+        writer.trailer(timestamp=results["timestamp"], timings=results["timings"],
+                       throttle=results["throttle"])
+        if history is not None:
+            history.finish_scan(scan_id)
+    finally:
+        if history is not None:
+            history.close()
+        if output:
+            out.close()
+
+def _scan_fleet(targets_file: str, agent_type: Optional[str], output: Optional[str],
+                config: 'AISSConfig') -> None:
+    """Scan every target in a file, writing one JSON line per target"""
+    import asyncio
+    from ..core.fleet import FleetProgress, FleetRecord, FleetScanner, iter_targets
+    from ..core.models import Finding
+
+    with open(targets_file) as f:
+        total = sum(1 for _ in iter_targets(f, agent_type, on_error=lambda number, error: None))
+
+    def skip_line(number: int, error: str) -> None:
+        click.echo(f"\nSkipping line {number} of {targets_file}: {error}", err=True)
+
+    def show_progress(progress: FleetProgress) -> None:
+        click.echo(f"\r{progress.format()}", err=True, nl=False)
+
+    on_record = None
+    history = _history(config) if config.history.enabled else None
+    if history is not None:
+        scan_id = history.begin_scan("fleet", label=targets_file)
+
+        def on_record(record: FleetRecord) -> None:
+            target, _, error, findings, _ = record
+            history.add_target(scan_id, target, map(Finding.from_tuple, findings), error)
+
+    out = open(output, 'w') if output else sys.stdout
+    try:
+        with open(targets_file) as f:
+            fleet = FleetScanner(config, output=out, on_progress=show_progress, on_record=on_record)
+            progress = asyncio.run(fleet.run(iter_targets(f, agent_type, on_error=skip_line),
+                                             total=total))
+        if history is not None:
+            history.finish_scan(scan_id)
+    finally:
+        if history is not None:
+            history.close()
+        if output:
+            out.close()
+    click.echo(f"\nFleet scan finished: {progress.format()}", err=True)
+
+@cli.command()
+@click.argument('results', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', help='Output file for the report')
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'html', 'ndjson']), default='text')
+def aggregate(results: tuple, output: Optional[str], format: str):
+    """Collapse findings from scan or fleet results into one entry per issue"""
+    from datetime import datetime
+    from ..core.config import AISSConfig
+    from ..reporting.aggregate import FindingAggregator
+    from ..reporting.generator import ReportGenerator
+    from ..reporting.stream import read_findings
+
+    config = AISSConfig.load()
+    issues = FindingAggregator()
+    for path in results:
+        with open(path) as f:
+            issues.extend(read_findings(f))
+
+    config.report.output_format = format
+    metadata = {"timestamp": datetime.utcnow().isoformat(), "target": ", ".join(results)}
+    report = ReportGenerator(config.report).generate(issues, metadata)
+    if output:
+        with open(output, 'w') as f:
+            f.write(report)
+    elif format != 'text':
+        click.echo(report)
 
 @cli.command()
+def modules():
+    """List registered test modules and what they need"""
+    from rich.table import Table
+    from ..modules.registry import registry
+
+    table = Table("Module", "Description", "Endpoints", "Requires", "After", "Cost")
+    for spec in registry:
+        table.add_row(spec.name, spec.description, " ".join(spec.endpoints),
+                      " ".join(spec.requires), " ".join(spec.after), f"{spec.cost:g}")
+    _console().print(table)
+
+@cli.command()
+@click.argument('old', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', help='Output file for the diff')
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'html', 'ndjson']), default='text')
+def diff(old: str, new: str, output: Optional[str], format: str):
+    """Show new, fixed and unchanged findings between two scan or fleet results"""
+    from datetime import datetime
+    from ..core.config import AISSConfig
+    from ..reporting.diff import diff_findings
+    from ..reporting.generator import ReportGenerator
+    from ..reporting.stream import read_findings
+
+    config = AISSConfig.load()
+    failed: Dict[str, str] = {}
+    with open(old) as old_file, open(new) as new_file:
+        changes = diff_findings(read_findings(old_file), read_findings(new_file, failed), failed)
+
+    config.report.output_format = format
+    metadata = {"timestamp": datetime.utcnow().isoformat(), "target": f"{old} -> {new}",
+                "old": old, "new": new}
+    report = ReportGenerator(config.report).generate_diff(changes, metadata)
+    if output:
+        with open(output, 'w') as f:
+            f.write(report)
+    elif format != 'text':
+        click.echo(report)
+
+@cli.command()
+@click.option('--days', type=float, default=30, show_default=True, help='Only findings from the last N days')
+@click.option('--severity', '-s', multiple=True, type=click.Choice(SEVERITY_NAMES, case_sensitive=False),
+              help='Only these severities (repeatable)')
+@click.option('--target', help='Only findings for this target')
+@click.option('--by', 'group_by', type=click.Choice(['target', 'day', 'fingerprint', 'severity']),
+              default='target', show_default=True, help='Group finding counts by')
+@click.option('--limit', type=int, help='Show at most N rows')
+@click.option('--scans', 'list_scans', is_flag=True, help='List recent scans instead of finding counts')
+@click.option('--format', '-f', type=click.Choice(['text', 'json']), default='text')
+@click.option('--db', help='History database (default from config)')
+def history(days: float, severity: tuple, target: Optional[str], group_by: str,
+            limit: Optional[int], list_scans: bool, format: str, db: Optional[str]):
+    """Query recorded scan history, e.g. CRITICAL findings per target over 30 days"""
+    import json
+    from ..core.config import AISSConfig
+    from ..core.models import SeverityLevel
+
+    with _history(AISSConfig.load(), db) as store:
+        if list_scans:
+            columns = ('id', 'kind', 'label', 'started', 'finished', 'targets', 'findings')
+            rows = store.scans(limit or 20)
+        else:
+            columns = (group_by, 'findings')
+            levels = [SeverityLevel(name.upper()) for name in severity]
+            rows = store.counts(days, levels, target, group_by, limit)
+
+    if format == 'json':
+        click.echo(json.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+        return
+
+    from datetime import datetime
+    from rich.table import Table
+
+    table = Table(*columns)
+    for row in rows:
+        if list_scans:
+            row = list(row)
+            for i in (3, 4):
+                row[i] = datetime.fromtimestamp(row[i]).isoformat(' ', 'seconds') if row[i] else ''
+        table.add_row(*(str(value) if value is not None else '' for value in row))
+    _console().print(table)
+
+@cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
 @click.option('--output', '-o', help='Output file for results')
 @click.option('--format', '-f', type=click.Choice(['text', 'json', 'html']), default='text')
-def self_check(output: Optional[str] = None, format: str = 'text'):
-    """Run security self-check on this agent"""
+@click.option('--exclude', '-x', multiple=True,
+              help='Also skip this file/directory name or relative path glob (repeatable)')
+@click.option('--workers', type=int, help='Scanner processes (0 = one per CPU)')
+@click.option('--index/--no-index', default=None,
+              help='Only rescan files changed since the last run')
+def self_check(paths: tuple, output: Optional[str] = None, format: str = 'text',
+               exclude: tuple = (), workers: Optional[int] = None, index: Optional[bool] = None):
+    """Run security self-check on this agent
+
+    Scans the agent's workspace, memory and config files (PATHS, default
+    the configured self-check paths) for stored API keys and other secrets.
+    """
+    from ..core.config import AISSConfig
+
     try:
-        console.print("[bold blue]Starting self-check...[/bold blue]")
-        
-        scanner = SecurityScanner()
-        results = asyncio.run(scanner.run_self_check())
-        
-        # ... (reporting logic)
-        
+        config = AISSConfig.load()
+        config.self_check.exclude.extend(exclude)
+        if workers is not None:
+            config.self_check.workers = workers
+        if index is not None:
+            config.self_check.index_enabled = index
+        _self_check(config, list(paths), format, output)
     except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        _console().print(f"[bold red]Error:[/bold red] {str(e)}")
+
+def _self_check(config: 'AISSConfig', paths: list, format: str = 'text',
+                output: Optional[str] = None) -> None:
+    import asyncio
+    from ..core.scanner import SecurityScanner
+
+    _console().print("[bold blue]Starting self-check...[/bold blue]")
+    results = asyncio.run(SecurityScanner(config=config).run_self_check(paths or None))
+    files = results["files"]
+    _console().print(
+        f"Checked {files['files']} files in {files['duration']:.1f}s: {files['scanned']} scanned "
+        f"({files['bytes_scanned'] / 1048576:.1f} MB), {files['reused']} unchanged, "
+        f"{files['binary']} binary, {files['excluded']} excluded, {files['errors']} unreadable"
+    )
+    _write_report(results, config, format, output)
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Persistent probe/response cache
+"""
+from typing import Any, Dict, Optional
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed);
+"""
+
+class ResponseCache:
+    """On-disk cache of probe responses with a TTL and size-bounded LRU eviction.
+
+    Entries are compressed JSON stored in SQLite (WAL mode, so fleet
+    workers can share one cache file). When the total size exceeds
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._db: Optional[sqlite3.Connection] = None
+        self._total = 0
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.open()
+        return self._db
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached value for ``key``, or None when missing or expired"""
+        row = self.db.execute("SELECT created, size, value FROM responses WHERE key = ?",
+                              (key,)).fetchone()
+        if row is None:
+            return None
+        created, size, value = row
+        now = time.time()
+        if now - created > self.ttl:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total -= size
+            return None
+        self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(value))
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` and evict old entries if needed"""
+        blob = zlib.compress(json.dumps(value).encode())
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        old = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, created, accessed, size, value) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, now, now, len(blob), blob)
+        )
+        self._total += len(blob) - (old[0] if old else 0)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones, until under budget"""
+        self.db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        self._total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self._total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            victims.append((key,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+        self.db.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        self.db.execute("DELETE FROM responses")
+        self._total = 0
@@ -0,0 +1,128 @@
+"""
+Record/replay cassettes of probe traffic
+"""
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+import aiohttp
+
+MAGIC = b"AISSCAS\x01"
+# Record header: payload length, then the request fingerprint
+_RECORD = struct.Struct("<I32s")
+
+class CassetteMissError(aiohttp.ClientConnectionError):
+    """A replayed request that was never recorded.
+
+    Raised as a connection error, so modules treat an unrecorded probe the
+    way they treat an unreachable target.
+    """
+
+def request_fingerprint(method: str, url: str, kwargs: Dict[str, Any]) -> bytes:
+    """Digest of everything in a request that can change the response"""
+    material = json.dumps([
+        method.upper(),
+        url,
+        kwargs.get("json"),
+        kwargs.get("data") if isinstance(kwargs.get("data"), str) else None,
+        sorted((kwargs.get("headers") or {}).items()),
+        kwargs.get("allow_redirects", True),
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode()).digest()
+
+class Cassette:
+    """Append-only file of probe exchanges keyed by request fingerprint.
+
+    Each record is a length and fingerprint header followed by a
+    zlib-compressed JSON exchange: the response (or the error raised) and
+    its timing. Recording appends every exchange with a single write, so
+    fleet worker processes can share one cassette.
+
+    Replay memory-maps the file and indexes record offsets by fingerprint
+    from the headers alone; a record is decompressed only when served.
+    Requests recorded several times (rate-limit bursts, say) replay their
+    responses in recorded order, repeating the last one once exhausted.
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self._fd: Optional[int] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[bytes, List[int]] = {}
+        self._served: Dict[bytes, int] = {}
+        self.recorded = 0
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def open(self) -> None:
+        if self._fd is not None or self._map is not None:
+            return
+        if self.mode == "record":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, MAGIC)
+            return
+
+        self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size <= len(MAGIC):
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an AISS cassette")
+        self._build_index()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _build_index(self) -> None:
+        offset = len(MAGIC)
+        size = len(self._map)
+        while offset + _RECORD.size <= size:
+            length, key = _RECORD.unpack_from(self._map, offset)
+            if offset + _RECORD.size + length > size:
+                # Torn write at the end of an interrupted recording
+                break
+            self._index.setdefault(key, []).append(offset)
+            offset += _RECORD.size + length
+
+    def __len__(self) -> int:
+        return sum(len(offsets) for offsets in self._index.values())
+
+    def append(self, key: bytes, exchange: Dict[str, Any]) -> None:
+        """Record one exchange"""
+        if self._fd is None:
+            self.open()
+        payload = zlib.compress(json.dumps(exchange, separators=(",", ":")).encode())
+        os.write(self._fd, _RECORD.pack(len(payload), key) + payload)
+        self.recorded += 1
+
+    def next(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Next recorded exchange for ``key``, or None if it was never recorded"""
+        offsets = self._index.get(key)
+        if not offsets:
+            return None
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        offset = offsets[min(served, len(offsets) - 1)]
+        length, _ = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size
+        return json.loads(zlib.decompress(self._map[start:start + length]))
@@ -0,0 +1,96 @@
+"""
+Per-scan coalescing of identical idempotent probes
+"""
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+
+if TYPE_CHECKING:
+    from .detection import StreamInspector
+    from .http import ProbeResponse
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class ProbeMemo:
+    """Single-flight memo of probe responses for one scan.
+
+    The first request for a key goes to the network; identical requests
+    made while it is in flight wait for it, and later ones get its
+    response, all as the same immutable snapshot. Responses to a waiter
+    with an inspector are replayed through that inspector. Failures and
+    transient statuses (429, 5xx) are shared with waiters but not kept.
+    When the first request is cancelled, its waiters send their own.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.sent = 0
+        self.shared = 0
+
+    async def fetch(self, key: Hashable,
+                    send: Callable[[], Awaitable[Tuple['ProbeResponse', Optional[str]]]],
+                    inspector: Optional['StreamInspector'] = None) -> 'ProbeResponse':
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.shared += 1
+            outcome = await _follow(flight)
+            if outcome is None:
+                # Only the leader was cancelled; this request still wants an answer
+                self.shared -= 1
+                return await self.fetch(key, send, inspector)
+            response, body = outcome
+            if inspector is None:
+                return response
+            inspector.feed(body or "")
+            return replace(response, text=inspector.excerpt)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        self.sent += 1
+        try:
+            response, body = await send()
+        except asyncio.CancelledError:
+            del self._flights[key]
+            flight.cancel()
+            raise
+        except BaseException as e:
+            del self._flights[key]
+            flight.set_exception(e)
+            # Waiters re-raise it; without any, do not log it as unretrieved
+            flight.exception()
+            raise
+        if response.status >= 500 or response.status == 429:
+            del self._flights[key]
+        flight.set_result((response, body))
+        return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "shared": self.shared}
+
+async def _follow(flight: asyncio.Future) -> Optional[Tuple['ProbeResponse', Optional[str]]]:
+    """Outcome of another request's flight, or None if that request was cancelled.
+
+    The flight is relayed into a future of this waiter's own, so a
+    CancelledError raised here always means the waiter itself was
+    cancelled, on every Python version.
+    """
+    waiter = asyncio.get_running_loop().create_future()
+
+    def relay(done: asyncio.Future) -> None:
+        if waiter.done():
+            return
+        if done.cancelled():
+            waiter.set_result(None)
+        elif done.exception() is not None:
+            waiter.set_exception(done.exception())
+        else:
+            waiter.set_result(done.result())
+
+    flight.add_done_callback(relay)
+    try:
+        return await waiter
+    finally:
+        flight.remove_done_callback(relay)
+
+# Memo of the scan running in the current task, if any
+current_probes: ContextVar[Optional[ProbeMemo]] = ContextVar("aiss_current_probes", default=None)
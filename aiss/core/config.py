@@ -1,19 +1,63 @@
 """
 Configuration management for AISS
 """
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field, field_validator
 import yaml
 import os
 from pathlib import Path
 
 class ScanConfig(BaseModel):
     """Scan configuration settings"""
-    max_requests: int = Field(default=50, description="Maximum requests per test")
+    max_requests: int = Field(default=50, description="Maximum in-flight requests per target")
     timeout: int = Field(default=30, description="Request timeout in seconds")
     user_agent: str = Field(default="AISS-Scanner/1.0", description="User agent string")
     follow_redirects: bool = Field(default=True, description="Follow HTTP redirects")
     verify_ssl: bool = Field(default=True, description="Verify SSL certificates")
+    max_connections: int = Field(default=100, description="Connection pool size for the whole scan")
+    max_connections_per_host: int = Field(default=20, description="Pooled connections per host")
+    dns_cache_ttl: int = Field(default=300, description="DNS cache lifetime in seconds")
+    keepalive_timeout: float = Field(default=30.0, description="Idle keep-alive timeout in seconds")
+    max_response_bytes: int = Field(default=1048576, description="Bytes read from a response before inspection stops")
+    read_chunk_size: int = Field(default=16384, description="Chunk size for streamed response reads")
+    proof_excerpt_chars: int = Field(default=200, description="Response characters kept as finding proof")
+    slow_response_seconds: float = Field(default=5.0, description="Response time reported as slow")
+    modules: List[str] = Field(default_factory=list, description="Test modules to run (default all registered)")
+    module_concurrency: int = Field(default=4, description="Test modules run at the same time")
+    payload_paths: List[str] = Field(default_factory=list, description="Extra payload pack files or directories")
+    payload_index: Optional[str] = Field(default=None, description="Payload index database (default ~/.cache/aiss)")
+    payload_categories: List[str] = Field(default_factory=list, description="Only run payloads in these categories")
+    payload_tags: List[str] = Field(default_factory=list, description="Only run payloads with any of these tags")
+    rate_limit_steps: List[float] = Field(default_factory=lambda: [5.0, 10.0, 20.0, 50.0],
+                                          description="Request rates (per second) for rate-limit probes")
+    rate_limit_step_duration: float = Field(default=0.5, description="Seconds spent at each probe rate")
+    rate_limit_throttle_ratio: float = Field(default=0.05, description="Share of 429/503 responses that counts as throttling")
+    throttle_enabled: bool = Field(default=True, description="Pace probes with per-host adaptive rate limits")
+    throttle_initial_rate: float = Field(default=10.0, description="Starting probe rate per host (requests/second)")
+    throttle_min_rate: float = Field(default=0.5, description="Lowest probe rate per host after backoff")
+    throttle_max_rate: float = Field(default=200.0, description="Highest probe rate per host")
+    throttle_burst: float = Field(default=10.0, description="Probes a host may receive back to back")
+    throttle_increase: float = Field(default=1.0, description="Rate added per second of healthy responses")
+    throttle_decrease: float = Field(default=0.5, description="Rate multiplier applied on congestion")
+    throttle_latency_factor: float = Field(default=3.0, description="Latency over a route's baseline that counts as congestion")
+    throttle_max_pause: float = Field(default=60.0, description="Longest Retry-After pause honoured, in seconds")
+    cache_enabled: bool = Field(default=False, description="Reuse cached probe responses")
+    cache_path: str = Field(default="~/.cache/aiss/responses.sqlite", description="Response cache database")
+    cache_ttl: int = Field(default=86400, description="Cached response lifetime in seconds")
+    cache_max_bytes: int = Field(default=268435456, description="Response cache size limit")
+    cassette_mode: Optional[str] = Field(default=None, description="Probe traffic cassette: record or replay")
+    cassette_path: Optional[str] = Field(default=None, description="Cassette file for record/replay")
+    secret_min_length: int = Field(default=20, description="Shortest reply token scored for entropy as a possible secret")
+    secret_entropy_slack: float = Field(default=0.4, description="Entropy (bits/char) below that of a random string of the same length and alphabet still counted as random")
+    secret_batch_size: int = Field(default=4096, description="Candidate tokens scored together across a scan's replies")
+    secret_batch_delay: float = Field(default=0.002, description="Seconds a reply waits for others to share its scoring batch")
+
+    @field_validator("rate_limit_steps")
+    @classmethod
+    def _check_rate_limit_steps(cls, steps: List[float]) -> List[float]:
+        if not steps or any(step <= 0 for step in steps):
+            raise ValueError("rate_limit_steps needs at least one rate, all above zero")
+        return steps
 
 class ReportConfig(BaseModel):
     """Reporting configuration"""
@@ -22,15 +66,52 @@ class ReportConfig(BaseModel):
         description="Report detail level (minimal, standard, detailed)"
     )
     include_proof: bool = Field(default=True, description="Include proof details")
-    output_format: str = Field(default="text", description="Output format (text, json, html)")
+    aggregate: bool = Field(default=False, description="Report one entry per distinct issue across targets")
+    output_format: str = Field(default="text", description="Output format (text, json, html, ndjson)")
     save_path: Optional[str] = Field(default=None, description="Path to save reports")
     company_name: Optional[str] = Field(default=None, description="Company name for reports")
     logo_path: Optional[str] = Field(default=None, description="Path to logo for HTML reports")
+    plotly_js: str = Field(default="inline", description="Chart runtime for HTML reports: inline, cdn, or path/URL of a local copy")
+    html_page_size: int = Field(default=100, description="Findings shown per page in HTML reports")
+    template_cache_dir: Optional[str] = Field(default="~/.cache/aiss/templates",
+                                              description="Compiled template cache (None to disable)")
+
+class FleetConfig(BaseModel):
+    """Fleet scanning settings"""
+    concurrency: int = Field(default=64, description="Targets scanned at the same time")
+    per_host_concurrency: int = Field(default=4, description="Targets on one host scanned at the same time")
+    workers: int = Field(default=1, description="Worker processes, each with its own event loop (0 = one per CPU)")
+
+class HistoryConfig(BaseModel):
+    """Results history settings"""
+    enabled: bool = Field(default=False, description="Record every scan in the history database")
+    path: str = Field(default="~/.local/share/aiss/history.sqlite", description="History database")
+    batch_size: int = Field(default=500, description="Findings written per transaction")
+
+class SelfCheckConfig(BaseModel):
+    """Local secret scanning settings"""
+    paths: List[str] = Field(default_factory=list,
+                             description="Agent workspace, memory and config directories to scan (required)")
+    exclude: List[str] = Field(default_factory=lambda: [
+        ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox",
+        ".mypy_cache", ".pytest_cache", "*.pyc", "*.so", "*.dylib", "*.dll", "*.exe",
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.pdf", "*.zip", "*.gz",
+        "*.bz2", "*.xz", "*.zst", "*.tar", "*.whl", "*.mp3", "*.mp4", "*.woff", "*.woff2",
+    ], description="File or directory names (globs) to skip, or paths relative to a scanned root")
+    max_file_bytes: int = Field(default=0, description="Skip files larger than this (0 = no limit)")
+    workers: int = Field(default=0, description="Scanner processes (0 = one per CPU)")
+    parallel_min_bytes: int = Field(default=33554432, description="Data to scan before a process pool is used")
+    chunk_bytes: int = Field(default=67108864, description="Large files are scanned in ranges of this size")
+    index_enabled: bool = Field(default=True, description="Only rescan files changed since the last run")
+    index_path: str = Field(default="~/.cache/aiss/selfcheck.sqlite", description="Self-check index database")
 
 class AISSConfig(BaseModel):
     """Main configuration"""
     scan: ScanConfig = Field(default_factory=ScanConfig)
     report: ReportConfig = Field(default_factory=ReportConfig)
+    fleet: FleetConfig = Field(default_factory=FleetConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    self_check: SelfCheckConfig = Field(default_factory=SelfCheckConfig)
     log_level: str = Field(default="INFO")
     api_base_url: Optional[str] = Field(default=None)
     
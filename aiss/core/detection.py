@@ -0,0 +1,216 @@
+"""
+Multi-pattern detection engine shared by all response analyzers
+"""
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+import re
+from .secrets import CREDENTIAL_WORDS, TokenCollector
+
+class Match(NamedTuple):
+    """One indicator occurrence in a response"""
+    indicator: str
+    start: int
+    end: int
+
+class DetectionResult:
+    """Indicator matches found in one response, in offset order"""
+
+    def __init__(self, matches: List[Match]):
+        self.matches = matches
+
+    def __bool__(self) -> bool:
+        return bool(self.matches)
+
+    @property
+    def indicators(self) -> List[str]:
+        """Distinct matched indicators in order of first occurrence"""
+        return list(dict.fromkeys(match.indicator for match in self.matches))
+
+    def matching(self, indicators: Iterable[str]) -> List[Match]:
+        """Matches restricted to the given indicators"""
+        wanted = {indicator.lower() for indicator in indicators}
+        return [match for match in self.matches if match.indicator in wanted]
+
+    def describe(self, limit: int = 5) -> str:
+        """Short proof line listing matched indicators and their offsets"""
+        return ", ".join(f"'{m.indicator}' at {m.start}" for m in self.matches[:limit])
+
+class DetectionEngine:
+    """Case-insensitive multi-pattern matcher.
+
+    All indicators are compiled into one alternation of groups, longest
+    first, and each response is scanned in a single pass without
+    lowercasing it. Every occurrence is reported, including overlapping ones: the search
+    resumes one character after each match start, and shorter indicators
+    that are prefixes of a match are added at the same offset.
+    """
+
+    def __init__(self, indicator_sets: Mapping[str, Iterable[str]]):
+        self.groups: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(i.lower() for i in indicators if i))
+            for name, indicators in indicator_sets.items()
+        }
+        indicators = sorted(
+            {i for group in self.groups.values() for i in group},
+            key=lambda i: (-len(i), i)
+        )
+        self.indicators: Tuple[str, ...] = tuple(indicators)
+        self.indicator_set: FrozenSet[str] = frozenset(indicators)
+        self.max_length = len(indicators[0]) if indicators else 0
+        self._pattern: Optional[re.Pattern] = (
+            re.compile("|".join(f"({re.escape(i)})" for i in indicators), re.IGNORECASE)
+            if indicators else None
+        )
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            i: tuple(p for p in indicators if p != i and i.startswith(p))
+            for i in indicators
+        }
+
+    def scan(self, text: str, offset: int = 0) -> DetectionResult:
+        """Find every indicator occurrence in ``text``.
+
+        ``offset`` is added to reported positions, for callers that scan a
+        larger body piece by piece.
+        """
+        matches: List[Match] = []
+        if self._pattern is None:
+            return DetectionResult(matches)
+
+        search = self._pattern.search
+        pos = 0
+        while True:
+            found = search(text, pos)
+            if found is None:
+                break
+            start = found.start()
+            # Case folding can match text whose lowercase is no indicator
+            # (``ſ`` matches ``s``), so the group says which one matched
+            indicator = self.indicators[found.lastindex - 1]
+            matches.append(Match(indicator, offset + start, offset + found.end()))
+            for prefix in self._prefixes[indicator]:
+                matches.append(Match(prefix, offset + start, offset + start + len(prefix)))
+            pos = start + 1
+
+        return DetectionResult(matches)
+
+    def group(self, name: str) -> Sequence[str]:
+        """Indicators registered under a group name"""
+        return self.groups[name]
+
+_INDICATOR_SETS: Dict[str, Tuple[str, ...]] = {}
+_default_engine: Optional[DetectionEngine] = None
+
+def register_indicators(name: str, indicators: Iterable[str]) -> None:
+    """Register a module's indicator list with the shared engine"""
+    global _default_engine
+    indicators = tuple(indicators)
+    if _INDICATOR_SETS.get(name) != indicators:
+        _INDICATOR_SETS[name] = indicators
+        _default_engine = None
+
+def default_engine() -> DetectionEngine:
+    """Shared engine built once from every registered indicator list"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = DetectionEngine(_INDICATOR_SETS)
+    return _default_engine
+
+_ENGINE_CACHE_SIZE = 256
+_engines: "OrderedDict[FrozenSet[str], DetectionEngine]" = OrderedDict()
+
+def engine_for(indicators: Iterable[str]) -> DetectionEngine:
+    """Engine able to match ``indicators``.
+
+    The shared engine is used when it already covers them; indicator sets
+    that only appear in payload packs get a cached engine of their own.
+    """
+    wanted = frozenset(indicator.lower() for indicator in indicators)
+    engine = default_engine()
+    if wanted <= engine.indicator_set:
+        return engine
+    engine = _engines.get(wanted)
+    if engine is None:
+        engine = _engines[wanted] = DetectionEngine({"payload": wanted})
+        if len(_engines) > _ENGINE_CACHE_SIZE:
+            _engines.popitem(last=False)
+    else:
+        _engines.move_to_end(wanted)
+    return engine
+
+class StreamInspector:
+    """Incremental inspection of a response body.
+
+    Decoded chunks are fed as they arrive. A tail of the previous chunk is
+    rescanned with each new one so indicators split across chunk boundaries
+    are still found. Only bounded excerpts are kept, never the whole body.
+
+    With a ``secrets`` collector, candidate secret tokens are gathered as
+    well. Indicators that merely name a credential ("token", "password")
+    are then not conclusive on their own: reading goes on until a token of
+    a known key format turns up or another indicator matches.
+    """
+
+    def __init__(self, indicators: Iterable[str], engine: Optional[DetectionEngine] = None,
+                 excerpt_chars: int = 200, stop_on_match: bool = True, max_matches: int = 50,
+                 secrets: Optional[TokenCollector] = None):
+        self.wanted = {indicator.lower() for indicator in indicators}
+        self.engine = engine or engine_for(self.wanted)
+        self.excerpt_chars = excerpt_chars
+        self.stop_on_match = stop_on_match
+        self.max_matches = max_matches
+        self.secrets = secrets
+        self.matches: List[Match] = []
+        self.excerpt = ""
+        self.match_context = ""
+        self.chars_seen = 0
+        self._tail = ""
+
+    @property
+    def conclusive(self) -> bool:
+        if not self.stop_on_match:
+            return False
+        if self.secrets is None:
+            return bool(self.matches)
+        return bool(self.secrets.formatted) or any(
+            match.indicator not in CREDENTIAL_WORDS for match in self.matches
+        )
+
+    def feed(self, text: str) -> bool:
+        """Inspect the next decoded chunk; returns True once conclusive"""
+        if not text:
+            return self.conclusive
+        if len(self.excerpt) < self.excerpt_chars:
+            self.excerpt += text[:self.excerpt_chars - len(self.excerpt)]
+        if self.secrets is not None:
+            self.secrets.feed(text)
+
+        window = self._tail + text
+        base = self.chars_seen - len(self._tail)
+        seen_before = self.chars_seen
+        for match in self.engine.scan(window, offset=base).matches:
+            # Matches ending inside the old tail were reported by the last chunk
+            if match.end <= seen_before or match.indicator not in self.wanted:
+                continue
+            if not self.matches:
+                start = max(0, match.start - base - 80)
+                self.match_context = window[start:match.end - base + 80]
+            if len(self.matches) < self.max_matches:
+                self.matches.append(match)
+
+        self.chars_seen += len(text)
+        keep = self.engine.max_length - 1
+        self._tail = window[-keep:] if keep > 0 else ""
+        return self.conclusive
+
+    @property
+    def result(self) -> DetectionResult:
+        return DetectionResult(self.matches)
+
+    def proof(self) -> str:
+        """Bounded proof excerpt for a finding"""
+        lines = [f"Response: {self.excerpt}..."]
+        if self.matches:
+            if self.matches[0].end > len(self.excerpt):
+                lines.append(f"Context: ...{self.match_context}...")
+            lines.append(f"Matched: {self.result.describe()}")
+        return "\n".join(lines)
@@ -0,0 +1,288 @@
+"""
+Fleet scanning: many targets under bounded concurrency
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator,
+                    List, Optional, TextIO, Tuple, Union)
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import threading
+import time
+import zlib
+from yarl import URL
+from .config import AISSConfig
+from .http import HTTPClient
+from .models import Finding, SeverityLevel
+from .scanner import SecurityScanner
+
+logger = logging.getLogger(__name__)
+
+def resolve_agent_target(agent_type: Optional[str], agent_id: str) -> str:
+    """Build the target URL for a Moltbook/OpenClaw agent ID"""
+    if agent_type == 'moltbook':
+        return f"https://www.moltbook.com/agents/{agent_id}"
+    elif agent_type == 'openclaw':
+        # Use OpenClaw's agent endpoint
+        return f"http://localhost:3000/agents/{agent_id}"
+    raise ValueError(f"Agent ID '{agent_id}' needs an agent type (moltbook or openclaw)")
+
+def _parse_target_line(line: str, agent_type: Optional[str]) -> str:
+    if line.startswith("{"):
+        entry = json.loads(line)
+        target = entry.get("target") or entry.get("url")
+        if target:
+            return target
+        if entry.get("agent_id"):
+            return resolve_agent_target(entry.get("type", agent_type), entry["agent_id"])
+        raise ValueError(f"Entry has no target, url or agent_id: {line}")
+    if "://" in line:
+        return line
+    return resolve_agent_target(agent_type, line)
+
+def iter_targets(lines: Iterable[str], agent_type: Optional[str] = None,
+                 on_error: Optional[Callable[[int, str], None]] = None) -> Iterator[str]:
+    """Yield target URLs from a targets file.
+
+    Each line is a URL, a bare agent ID, or a JSON object with ``target``,
+    ``url`` or ``agent_id`` (and optionally ``type``). Blank lines and
+    ``#`` comments are skipped. So are lines that cannot be parsed, so one
+    bad entry does not stop a fleet scan; each is passed to ``on_error``
+    with its line number and the reason, or logged without one.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            target = _parse_target_line(line, agent_type)
+        except ValueError as e:
+            if on_error is None:
+                logger.warning("Skipping targets line %d: %s", number, e)
+            else:
+                on_error(number, str(e))
+            continue
+        yield target
+
+@dataclass
+class FleetProgress:
+    """Running totals for a fleet scan"""
+    total: Optional[int] = None
+    completed: int = 0
+    failed: int = 0
+    findings: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Targets finished per second"""
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        done = f"{self.completed}/{self.total}" if self.total is not None else str(self.completed)
+        return (f"{done} targets, {self.failed} failed, {self.findings} findings, "
+                f"{self.rate:.1f} targets/s")
+
+# Compact per-target record: (target, timestamp, error, finding tuples, timing summary)
+FleetRecord = Tuple[str, str, Optional[str], List[Tuple[str, ...]], Dict[str, Any]]
+
+class FleetScanner:
+    """Scan many targets, streaming one JSON line per finished target.
+
+    A global limit bounds how many targets are scanned at once and a
+    per-host limit keeps many targets on one host from piling onto it.
+    Results are written as soon as each target finishes and are not kept.
+
+    With ``workers > 1`` targets are sharded by host across worker
+    processes, each running its own event loop and connection pool.
+    """
+
+    def __init__(self, config: Optional[AISSConfig] = None, output: Optional[TextIO] = None,
+                 on_progress: Optional[Callable[[FleetProgress], None]] = None,
+                 sink: Optional[Callable[[FleetRecord], None]] = None,
+                 on_record: Optional[Callable[[FleetRecord], None]] = None):
+        self.config = config or AISSConfig()
+        self.output = output
+        self.on_progress = on_progress
+        # Called in this process for every finished target, e.g. to store history
+        self.on_record = on_record
+        # Worker processes hand records to the parent instead of writing them
+        self.sink = sink
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def workers(self) -> int:
+        workers = self.config.fleet.workers
+        return workers if workers > 0 else (os.cpu_count() or 1)
+
+    def _host_limit(self, target: str) -> asyncio.Semaphore:
+        host = _target_host(target)
+        limiter = self._host_limits.get(host)
+        if limiter is None:
+            limiter = asyncio.Semaphore(max(1, self.config.fleet.per_host_concurrency))
+            self._host_limits[host] = limiter
+        return limiter
+
+    async def run(self, targets: Union[Iterable[str], AsyncIterable[str]],
+                  total: Optional[int] = None) -> FleetProgress:
+        """Scan every target and return the final progress totals"""
+        progress = FleetProgress(total=total)
+        if self.workers > 1 and self.sink is None:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._run_workers, targets, progress)
+            return progress
+
+        slots = asyncio.Semaphore(max(1, self.config.fleet.concurrency))
+        pending = set()
+
+        async with HTTPClient(self.config.scan) as client:
+            async for target in _aiter(targets):
+                # Acquire before spawning so only `concurrency` tasks exist at once
+                await slots.acquire()
+                task = asyncio.ensure_future(self._scan_target(client, target, progress))
+                task.add_done_callback(lambda _: slots.release())
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+
+        return progress
+
+    async def _scan_target(self, client: HTTPClient, target: str,
+                           progress: FleetProgress) -> None:
+        async with self._host_limit(target):
+            try:
+                scanner = SecurityScanner(target, self.config, client=client)
+                results = await scanner.run_scan()
+                record = (target, results["timestamp"], None,
+                          [finding.to_tuple() for finding in results["findings"]],
+                          results["timings"])
+            except Exception as e:
+                record = (target, datetime.utcnow().isoformat(), str(e), [], {})
+
+        if self.sink is not None:
+            self.sink(record)
+        else:
+            self._write(record, progress)
+
+    def _write(self, record: FleetRecord, progress: FleetProgress) -> None:
+        """Write a finished target and update progress"""
+        target, timestamp, error, findings, timings = record
+        progress.completed += 1
+        if error is not None:
+            progress.failed += 1
+            line = {"target": target, "timestamp": timestamp, "error": error}
+        else:
+            progress.findings += len(findings)
+            summary = {level.value: 0 for level in SeverityLevel}
+            for finding in findings:
+                summary[finding[0]] += 1
+            line = {
+                "target": target,
+                "timestamp": timestamp,
+                "summary": summary,
+                "findings": [Finding.from_tuple(finding).to_dict() for finding in findings],
+                "timings": timings
+            }
+
+        if self.output is not None:
+            self.output.write(json.dumps(line) + "\n")
+            self.output.flush()
+        if self.on_record is not None:
+            self.on_record(record)
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def _run_workers(self, targets: Iterable[str], progress: FleetProgress) -> None:
+        """Shard targets across worker processes and merge their records"""
+        workers = self.workers
+        ctx = multiprocessing.get_context("spawn")
+        worker_config = self.config.model_copy(deep=True)
+        worker_config.fleet.workers = 1
+        worker_config.fleet.concurrency = max(1, -(-self.config.fleet.concurrency // workers))
+
+        # Bounded inputs give back-pressure so the targets file is never fully loaded
+        inputs = [ctx.Queue(maxsize=worker_config.fleet.concurrency * 2) for _ in range(workers)]
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_worker_main, args=(worker_config, inputs[i], results), daemon=True)
+            for i in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+
+        # A failure reading targets is raised here once the workers are done
+        feed_error: List[BaseException] = []
+
+        def feed() -> None:
+            try:
+                for target in targets:
+                    # All targets of a host go to one worker so per-host limits hold
+                    shard = zlib.crc32(_target_host(target).encode()) % workers
+                    inputs[shard].put(target)
+            except BaseException as e:
+                feed_error.append(e)
+            finally:
+                for queue in inputs:
+                    queue.put(None)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        running = workers
+        while running:
+            try:
+                record = results.get(timeout=1.0)
+            except queue_module.Empty:
+                # A crashed worker never sends its sentinel
+                running = sum(1 for proc in procs if proc.is_alive())
+                continue
+            if record is None:
+                running -= 1
+            else:
+                self._write(record, progress)
+
+        # The feeder is stuck on a full queue if a worker crashed
+        feeder.join(timeout=5.0)
+        for proc in procs:
+            proc.join()
+        if feed_error:
+            raise feed_error[0]
+
+def _target_host(target: str) -> str:
+    return URL(target).host or target
+
+async def _aiter(targets: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(targets, "__aiter__"):
+        async for target in targets:
+            yield target
+    else:
+        for target in targets:
+            yield target
+
+async def _queue_targets(inputs: Any) -> AsyncIterator[str]:
+    """Yield targets from a multiprocessing queue without blocking the loop"""
+    loop = asyncio.get_event_loop()
+    while True:
+        target = await loop.run_in_executor(None, inputs.get)
+        if target is None:
+            return
+        yield target
+
+def _worker_main(config: AISSConfig, inputs: Any, results: Any) -> None:
+    """Entry point of a fleet worker process"""
+    try:
+        fleet = FleetScanner(config, sink=results.put)
+        asyncio.run(fleet.run(_queue_targets(inputs)))
+    finally:
+        results.put(None)
@@ -0,0 +1,378 @@
+"""
+Shared HTTP client for AISS test modules
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+import asyncio
+import codecs
+import hashlib
+import json
+import time
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+from .cache import ResponseCache
+from .cassette import Cassette, CassetteMissError, request_fingerprint
+from .coalesce import IDEMPOTENT_METHODS, current_probes
+from .config import ScanConfig
+from .detection import StreamInspector
+from .throttle import Throttle, parse_retry_after
+from .tracing import RequestTiming, create_trace_config, current_module, current_stats
+
+@dataclass(frozen=True)
+class ProbeResponse:
+    """Immutable snapshot of a probe response, detached from the connection.
+
+    ``text`` holds at most ``max_response_bytes`` of the body, or only the
+    inspector's excerpt when the body was streamed through an inspector.
+    Snapshots may be shared by every module of a scan.
+    """
+    status: int
+    headers: Mapping[str, str]
+    text: str
+    url: str
+    bytes_read: int = 0
+    truncated: bool = False
+    # When served from the response cache: time of the original fetch
+    cached_at: Optional[str] = None
+    timing: Optional[RequestTiming] = None
+
+def create_session(config: ScanConfig) -> aiohttp.ClientSession:
+    """Create a keep-alive session configured from scan settings"""
+    connector_kwargs = {}
+    if not config.verify_ssl:
+        connector_kwargs["ssl"] = False
+
+    connector = aiohttp.TCPConnector(
+        limit=config.max_connections,
+        limit_per_host=config.max_connections_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=config.dns_cache_ttl,
+        keepalive_timeout=config.keepalive_timeout,
+        **connector_kwargs
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=config.timeout),
+        headers={"User-Agent": config.user_agent},
+        trace_configs=[create_trace_config()]
+    )
+
+class HTTPClient:
+    """Connection pool owned by a scan and shared by every tester"""
+
+    def __init__(self, config: Optional[ScanConfig] = None):
+        self.config = config or ScanConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight: Dict[str, asyncio.Semaphore] = {}
+        self.throttle: Optional[Throttle] = None
+        if self.config.throttle_enabled:
+            self.throttle = Throttle(self.config)
+        self.cache: Optional[ResponseCache] = None
+        if self.config.cache_enabled:
+            self.cache = ResponseCache(self.config.cache_path, self.config.cache_ttl,
+                                       self.config.cache_max_bytes)
+        self.cassette: Optional[Cassette] = None
+        if self.config.cassette_mode:
+            if not self.config.cassette_path:
+                raise ValueError("cassette_path is required for cassette record/replay")
+            self.cassette = Cassette(self.config.cassette_path, self.config.cassette_mode)
+
+    async def __aenter__(self) -> 'HTTPClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the underlying session if it is not already open"""
+        if self.cassette is not None:
+            self.cassette.open()
+            if self.cassette.replaying:
+                # Replayed scans never touch the network
+                return
+        if self._session is None or self._session.closed:
+            self._session = create_session(self.config)
+        if self.cache is not None:
+            self.cache.open()
+
+    async def close(self) -> None:
+        """Close the session and release pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.cache is not None:
+            self.cache.close()
+        if self.cassette is not None:
+            self.cassette.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTPClient is not open")
+        return self._session
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Key identifying the target host for pacing and in-flight limits"""
+        parsed = URL(url)
+        return f"{parsed.host}:{parsed.port}"
+
+    def _limiter(self, key: str) -> asyncio.Semaphore:
+        """Per-target semaphore capping in-flight requests at max_requests"""
+        limiter = self._in_flight.get(key)
+        if limiter is None:
+            limiter = asyncio.Semaphore(max(1, self.config.max_requests))
+            self._in_flight[key] = limiter
+        return limiter
+
+    async def request(self, method: str, url: str,
+                      inspector: Optional[StreamInspector] = None,
+                      cacheable: bool = False,
+                      throttled: bool = True,
+                      coalesce: bool = True,
+                      **kwargs: Any) -> ProbeResponse:
+        """Send a request and return a detached response snapshot.
+
+        The body is streamed in chunks and never read past
+        ``max_response_bytes``. With an ``inspector`` each decoded chunk is
+        fed to it and reading stops as soon as it is conclusive.
+
+        ``cacheable`` probes are served from the response cache when it is
+        enabled; the cached body is replayed through the inspector.
+
+        Network probes carry a ``RequestTiming``, which is also recorded in
+        the current scan's timing stats under the current module.
+
+        ``throttled`` probes are paced by the per-host adaptive throttle and
+        their outcome adjusts its rate. Load probes opt out so they can
+        measure the target's own limits.
+
+        With a cassette, every exchange is recorded with its full (capped)
+        body, or served from the cassette without any network access.
+
+        Within a scan, identical idempotent requests are coalesced into one
+        network call whose response is shared (see ``ProbeMemo``). Load
+        probes pass ``coalesce=False`` since each of their requests counts.
+        """
+        kwargs.setdefault("allow_redirects", self.config.follow_redirects)
+        memo = current_probes.get() if coalesce and method.upper() in IDEMPOTENT_METHODS else None
+        if memo is None:
+            response, _ = await self._send(method, url, inspector, cacheable, throttled, False, kwargs)
+            return response
+        # Inspected requests may stop reading early, so only requests that
+        # look for the same indicators the same way share a body
+        key = (request_fingerprint(method, url, kwargs),
+               (tuple(sorted(inspector.wanted)), inspector.stop_on_match,
+                inspector.secrets is not None)
+               if inspector is not None else None)
+        return await memo.fetch(
+            key, lambda: self._send(method, url, inspector, cacheable, throttled, True, kwargs),
+            inspector
+        )
+
+    async def _send(self, method: str, url: str, inspector: Optional[StreamInspector],
+                    cacheable: bool, throttled: bool, keep_body: bool,
+                    kwargs: Dict[str, Any]) -> Tuple[ProbeResponse, Optional[str]]:
+        """Serve a request from the cassette or cache, or send it.
+
+        Returns the response and, with ``keep_body``, the decoded body
+        that was consumed.
+        """
+        recording = None
+        if self.cassette is not None:
+            if self.cassette.replaying:
+                return self._replay(method, url, inspector, kwargs)
+            recording = request_fingerprint(method, url, kwargs)
+
+        cache_key = None
+        # Recordings must hold every exchange, so they bypass the cache
+        if cacheable and self.cache is not None and recording is None:
+            cache_key = self._cache_key(method, url, inspector, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._from_cache(cached, inspector), cached["body"]
+
+        key = self.host_key(url)
+        throttle = self.throttle.for_host(key) if throttled and self.throttle is not None else None
+        if throttle is not None:
+            await throttle.acquire()
+
+        timing = RequestTiming()
+        async with self._limiter(key):
+            started = time.perf_counter()
+            try:
+                async with self.session.request(method, url, trace_request_ctx=timing,
+                                                **kwargs) as resp:
+                    text, bytes_read, truncated, body = await self._read_body(
+                        resp, inspector,
+                        keep_body=keep_body or cache_key is not None or recording is not None,
+                        read_all=recording is not None
+                    )
+                    timing.total = time.perf_counter() - started
+                    response = ProbeResponse(
+                        status=resp.status,
+                        headers=resp.headers,
+                        text=text,
+                        url=str(resp.url),
+                        bytes_read=bytes_read,
+                        truncated=truncated,
+                        timing=timing
+                    )
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                if throttle is not None and isinstance(
+                        e, (asyncio.TimeoutError, aiohttp.ServerDisconnectedError)):
+                    throttle.observe_error()
+                if recording is not None:
+                    self.cassette.append(recording, {
+                        "error": "timeout" if isinstance(e, asyncio.TimeoutError) else "connection",
+                        "message": str(e)
+                    })
+                raise
+
+        if throttle is not None:
+            # Time to first byte tracks server load; body size does not
+            throttle.observe(response.status,
+                             timing.ttfb if timing.ttfb is not None else timing.total,
+                             parse_retry_after(response.headers.get("Retry-After")),
+                             route=f"{method.upper()} {URL(url).path}")
+
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(current_module.get(), timing)
+
+        if recording is not None:
+            self.cassette.append(recording, {
+                **self._to_cache(response, body),
+                "timing": [timing.queued, timing.dns, timing.connect, timing.ttfb, timing.total,
+                           timing.reused]
+            })
+
+        # Server errors and throttling are transient; never cache them
+        if cache_key is not None and response.status < 500 and response.status != 429:
+            self.cache.put(cache_key, self._to_cache(response, body))
+        return response, body
+
+    async def _read_body(self, resp: aiohttp.ClientResponse,
+                         inspector: Optional[StreamInspector],
+                         keep_body: bool = False,
+                         read_all: bool = False) -> Tuple[str, int, bool, Optional[str]]:
+        """Read a capped body, decoding incrementally.
+
+        Returns the response text (the inspector's excerpt when inspecting),
+        bytes read, whether the body was cut short, and with ``keep_body``
+        the decoded text that was consumed. ``read_all`` keeps reading up
+        to the cap after the inspector is conclusive.
+        """
+        try:
+            decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        limit = self.config.max_response_bytes
+        keep = inspector is None or keep_body
+        parts = []
+        bytes_read = 0
+        truncated = False
+        conclusive = False
+
+        async for chunk in resp.content.iter_chunked(self.config.read_chunk_size):
+            remaining = limit - bytes_read
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                truncated = True
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            if keep:
+                parts.append(text)
+            if inspector is not None and not conclusive and inspector.feed(text):
+                conclusive = True
+                if not read_all:
+                    # Conclusive: leave the rest of the body unread
+                    truncated = not resp.content.at_eof()
+                    break
+            if bytes_read >= limit:
+                truncated = truncated or not resp.content.at_eof()
+                break
+
+        tail = decoder.decode(b"", final=True)
+        parts.append(tail)
+        body = "".join(parts) if keep else None
+        if inspector is not None:
+            if not (conclusive and read_all):
+                inspector.feed(tail)
+            return inspector.excerpt, bytes_read, truncated, body
+        return body, bytes_read, truncated, body
+
+    def _cache_key(self, method: str, url: str, inspector: Optional[StreamInspector],
+                   kwargs: Dict[str, Any]) -> str:
+        """Hash of the request and the settings that shape its outcome"""
+        material = json.dumps([
+            method.upper(),
+            url,
+            kwargs.get("json"),
+            kwargs.get("data") if isinstance(kwargs.get("data"), str) else None,
+            sorted((kwargs.get("headers") or {}).items()),
+            sorted(inspector.wanted) if inspector is not None else None,
+            inspector is not None and inspector.secrets is not None,
+            self.config.user_agent,
+            self.config.follow_redirects,
+            self.config.verify_ssl,
+            self.config.max_response_bytes,
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    @staticmethod
+    def _to_cache(response: ProbeResponse, body: Optional[str]) -> Dict[str, Any]:
+        return {
+            "status": response.status,
+            "headers": list(response.headers.items()),
+            "body": body,
+            "url": response.url,
+            "bytes_read": response.bytes_read,
+            "truncated": response.truncated,
+            "fetched_at": datetime.utcnow().isoformat()
+        }
+
+    def _replay(self, method: str, url: str, inspector: Optional[StreamInspector],
+                kwargs: Dict[str, Any]) -> Tuple[ProbeResponse, Optional[str]]:
+        """Serve a request from the cassette, as the network answered it when recorded"""
+        exchange = self.cassette.next(request_fingerprint(method, url, kwargs))
+        if exchange is None:
+            raise CassetteMissError(f"No recorded response for {method} {url}")
+        if "error" in exchange:
+            if exchange["error"] == "timeout":
+                raise asyncio.TimeoutError()
+            raise aiohttp.ClientConnectionError(exchange["message"])
+
+        queued, dns, connect, ttfb, total, reused = exchange["timing"]
+        timing = RequestTiming(queued=queued, dns=dns, connect=connect, ttfb=ttfb,
+                               total=total, reused=reused)
+        response = replace(self._from_cache(exchange, inspector), cached_at=None, timing=timing)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(current_module.get(), timing)
+        return response, exchange["body"]
+
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any], inspector: Optional[StreamInspector]) -> ProbeResponse:
+        text = cached["body"] or ""
+        if inspector is not None:
+            inspector.feed(text)
+            text = inspector.excerpt
+        return ProbeResponse(
+            status=cached["status"],
+            headers=CIMultiDictProxy(CIMultiDict(cached["headers"])),
+            text=text,
+            url=cached["url"],
+            bytes_read=cached["bytes_read"],
+            truncated=cached["truncated"],
+            cached_at=cached["fetched_at"]
+        )
+
+    async def get(self, url: str, **kwargs: Any) -> ProbeResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> ProbeResponse:
+        return await self.request("POST", url, **kwargs)
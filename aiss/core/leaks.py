@@ -0,0 +1,188 @@
+"""
+Batched detection of secrets leaked in response bodies
+"""
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import math
+import numpy as np
+from .secrets import Candidate
+
+if TYPE_CHECKING:
+    from .config import ScanConfig
+
+class Leak(NamedTuple):
+    """A secret found in a response; ``kind`` is its key format or ``high_entropy``"""
+    kind: str
+    offset: int
+    value: str
+    entropy: float
+
+# Character classes of candidate tokens: upper, lower, digit, symbol; the
+# two high bits mark letters past ``f``, which hex strings do not use
+_CLASSES = np.zeros(128, dtype=np.uint8)
+_CLASSES[ord("A"):ord("Z") + 1] = 1
+_CLASSES[ord("G"):ord("Z") + 1] |= 16
+_CLASSES[ord("a"):ord("z") + 1] = 2
+_CLASSES[ord("g"):ord("z") + 1] |= 32
+_CLASSES[ord("0"):ord("9") + 1] = 4
+for _symbol in "_-+/.=":
+    _CLASSES[ord(_symbol)] = 8
+# Number of classes of each combination; letters that are all hex digits
+# and digits count as one class, so hex digests and UUIDs stay below three
+_CLASS_COUNT = np.array([bin(bits & 15).count("1") if bits & 48 or not bits & 3 else 1 + (bits >> 3 & 1)
+                         for bits in range(64)], dtype=np.uint8)
+# Alphabet size of each combination of classes: letters are six hex digits
+# unless one past ``f`` appears, and symbols count as the two that base64
+# adds to letters and digits
+_ALPHABET = np.array([(26 if bits & 16 else 6) * (bits & 1) + (26 if bits & 32 else 6) * (bits >> 1 & 1)
+                      + 10 * (bits >> 2 & 1) + 2 * (bits >> 3 & 1) for bits in range(64)], dtype=np.int64)
+
+@lru_cache(maxsize=None)
+def expected_entropy(length: int, alphabet: int) -> float:
+    """Mean Shannon entropy (bits per character) of uniform random strings.
+
+    Entropy measured on a short string falls below ``log2(alphabet)``
+    because not every character gets to appear at its true frequency. Each
+    character's count is binomial with ``p = 1 / alphabet``, so the mean is
+    ``alphabet * E[-(X / length) * log2(X / length)]`` over that binomial.
+    """
+    if length < 2 or alphabet < 2:
+        return 0.0
+    x = np.arange(1, length + 1)
+    log_choose = np.array([math.lgamma(length + 1) - math.lgamma(k + 1) - math.lgamma(length - k + 1)
+                           for k in range(1, length + 1)])
+    log_pmf = log_choose + x * math.log(1 / alphabet) + (length - x) * math.log1p(-1 / alphabet)
+    share = x / length
+    return float(-alphabet * (np.exp(log_pmf) * share * np.log2(share)).sum())
+
+def token_scores(tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Shannon entropy (bits per character), character class count and alphabet size of each token.
+
+    All tokens are scored at once: their characters are concatenated into
+    one array, and per-token character counts come from a single
+    ``bincount`` over ``token * 128 + character``.
+    """
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    codes = np.frombuffer("".join(tokens).encode("ascii", "replace"), dtype=np.uint8)
+    codes = np.minimum(codes, 127)
+    rows = np.repeat(np.arange(len(tokens)), lengths)
+    counts = np.bincount(rows * 128 + codes, minlength=len(tokens) * 128).reshape(len(tokens), 128)
+    p = counts / lengths[:, None]
+    log_p = np.log2(p, out=np.zeros_like(p), where=counts > 0)
+    entropy = -(p * log_p).sum(axis=1)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    bits = np.bitwise_or.reduceat(_CLASSES[codes], starts)
+    return entropy, _CLASS_COUNT[bits], _ALPHABET[bits]
+
+class LeakScorer:
+    """Decides which candidate tokens are leaked secrets.
+
+    A token of a known key format is always a leak. Any other token is one
+    when it is at least ``min_length`` characters long, mixes at least
+    ``min_classes`` character classes, and its Shannon entropy is within
+    ``entropy_slack`` bits per character of what a uniform random string
+    of its length over the alphabet of those classes has on average (see
+    ``expected_entropy``). The default slack keeps about 97% of random
+    20-character keys and all but a few in a thousand from 32 characters
+    on; identifiers, paths and prose repeat characters and fall short,
+    while hex digests and UUIDs lack the character classes, their letters
+    and digits counting as one.
+
+    Within a scan, probes hand their candidates to ``score``, which
+    gathers those of all responses completing within ``max_delay`` seconds
+    (or until ``batch_size`` tokens are pending) and scores them in one
+    vectorized pass.
+    """
+
+    def __init__(self, min_length: int = 20, entropy_slack: float = 0.4, min_classes: int = 3,
+                 batch_size: int = 4096, max_delay: float = 0.002):
+        self.min_length = min_length
+        self.entropy_slack = entropy_slack
+        self.min_classes = min_classes
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.tokens = 0
+        self._pending: List[Tuple[List[Candidate], asyncio.Future]] = []
+        self._size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def from_config(cls, config: 'ScanConfig') -> 'LeakScorer':
+        return cls(min_length=config.secret_min_length, entropy_slack=config.secret_entropy_slack,
+                   batch_size=config.secret_batch_size, max_delay=config.secret_batch_delay)
+
+    def evaluate(self, candidates: Sequence[Candidate]) -> List[Leak]:
+        """Score candidates right away"""
+        if not candidates:
+            return []
+        entropy, classes, alphabet = token_scores([candidate.token for candidate in candidates])
+        self.batches += 1
+        self.tokens += len(candidates)
+        return self._leaks(candidates, entropy, classes, alphabet)
+
+    async def score(self, candidates: Sequence[Candidate]) -> List[Leak]:
+        """Score candidates in the next batch"""
+        if not candidates:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(candidates), future))
+        self._size += len(candidates)
+        if self._size >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"batches": self.batches, "tokens": self.tokens}
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._size = self._pending, [], 0
+        if not pending:
+            return
+        try:
+            entropy, classes, alphabet = token_scores([c.token for batch, _ in pending for c in batch])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.tokens += len(entropy)
+        start = 0
+        for batch, future in pending:
+            end = start + len(batch)
+            # A probe cancelled while waiting no longer wants its result
+            if not future.done():
+                future.set_result(self._leaks(batch, entropy[start:end], classes[start:end],
+                                              alphabet[start:end]))
+            start = end
+
+    def _leaks(self, candidates: Sequence[Candidate], entropy: np.ndarray,
+               classes: np.ndarray, alphabet: np.ndarray) -> List[Leak]:
+        lengths = np.fromiter((len(c.token) for c in candidates), dtype=np.int64, count=len(candidates))
+        expected = np.fromiter((expected_entropy(int(n), int(k)) for n, k in zip(lengths, alphabet)),
+                               dtype=np.float64, count=len(candidates))
+        required = expected - self.entropy_slack
+        random = (lengths >= self.min_length) & (classes >= self.min_classes) & (entropy >= required)
+        return [
+            Leak(c.kind or "high_entropy", c.offset, c.token, round(float(entropy[i]), 2))
+            for i, c in enumerate(candidates) if c.kind is not None or random[i]
+        ]
+
+# Scorer of the scan running in the current task, if any
+current_scorer: ContextVar[Optional[LeakScorer]] = ContextVar("aiss_current_scorer", default=None)
+
+async def detect_leaks(candidates: Sequence[Candidate], config: 'ScanConfig') -> List[Leak]:
+    """Leaked secrets among ``candidates``, batched with the rest of the scan when one is running"""
+    scorer = current_scorer.get()
+    if scorer is None:
+        return LeakScorer.from_config(config).evaluate(candidates)
+    return await scorer.score(candidates)
@@ -0,0 +1,152 @@
+"""
+Load-probe engine for rate-limiting checks
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import math
+import time
+from .http import HTTPClient
+from .throttle import THROTTLE_STATUSES, parse_retry_after
+from .tracing import LatencyHistogram
+
+@dataclass
+class LoadStep:
+    """Outcome of sending requests at one target rate"""
+    target_rps: float
+    duration: float
+    sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    retry_after: Optional[float] = None
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    elapsed: float = 0.0
+
+    @property
+    def achieved_rps(self) -> float:
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def throttled_count(self) -> int:
+        return sum(self.statuses[status] for status in THROTTLE_STATUSES)
+
+    @property
+    def success_count(self) -> int:
+        return sum(count for status, count in self.statuses.items() if 200 <= status < 400)
+
+    def is_throttled(self, ratio: float) -> bool:
+        """Whether the target pushed back at this rate"""
+        return self.retry_after is not None or (
+            self.sent > 0 and self.throttled_count / self.sent >= ratio
+        )
+
+    def describe(self) -> str:
+        statuses = ", ".join(f"{status}x{count}" for status, count in sorted(self.statuses.items()))
+        if self.errors:
+            statuses = f"{statuses}, errors x{self.errors}" if statuses else f"errors x{self.errors}"
+        line = (f"{self.target_rps:g} rps (achieved {self.achieved_rps:.1f}): "
+                f"{self.sent} sent [{statuses}] "
+                f"p50 {self.latency.percentile(50) * 1000:.0f}ms "
+                f"p95 {self.latency.percentile(95) * 1000:.0f}ms "
+                f"p99 {self.latency.percentile(99) * 1000:.0f}ms")
+        if self.retry_after is not None:
+            line += f" Retry-After {self.retry_after:g}s"
+        return line
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target_rps": self.target_rps,
+            "achieved_rps": round(self.achieved_rps, 2),
+            "sent": self.sent,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": self.errors,
+            "retry_after": self.retry_after,
+            "p50_ms": round(self.latency.percentile(50) * 1000, 1),
+            "p95_ms": round(self.latency.percentile(95) * 1000, 1),
+            "p99_ms": round(self.latency.percentile(99) * 1000, 1),
+        }
+
+@dataclass
+class LoadResult:
+    """Rate curve measured by a load probe"""
+    url: str
+    steps: List[LoadStep]
+    throttle_rps: Optional[float] = None
+
+    @property
+    def throttled(self) -> bool:
+        return self.throttle_rps is not None
+
+    @property
+    def max_sustained_rps(self) -> float:
+        """Highest target rate answered without throttling, mostly successfully"""
+        sustained = [
+            step.target_rps for step in self.steps
+            if step.sent and step.throttled_count == 0 and step.success_count / step.sent >= 0.9
+        ]
+        return max(sustained) if sustained else 0.0
+
+    def curve(self) -> str:
+        return "\n".join(step.describe() for step in self.steps)
+
+class LoadProbe:
+    """Open-loop request generator.
+
+    Requests are launched on a fixed schedule at the target rate whether
+    or not earlier ones have completed, so a slow target cannot hide
+    throttling by slowing the probe down. ``ramp`` steps the rate up and
+    stops at the first step where the target throttles. Load probes bypass
+    the client's adaptive throttle, which would otherwise pace them.
+    """
+
+    def __init__(self, client: HTTPClient, throttle_ratio: float = 0.05):
+        self.client = client
+        self.throttle_ratio = throttle_ratio
+
+    async def open_loop(self, method: str, url: str, rps: float, duration: float,
+                        **kwargs: Any) -> LoadStep:
+        """Send requests at ``rps`` for ``duration`` seconds"""
+        step = LoadStep(target_rps=rps, duration=duration)
+        count = max(1, math.ceil(rps * duration))
+        interval = 1.0 / rps
+        tasks = []
+        start = time.monotonic()
+
+        for i in range(count):
+            delay = start + i * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self._send(step, method, url, **kwargs)))
+            step.sent += 1
+        # Launch window: achieved rate reflects how fast requests went out
+        step.elapsed = time.monotonic() - start + interval
+
+        await asyncio.gather(*tasks)
+        return step
+
+    async def ramp(self, method: str, url: str, steps: Sequence[float], step_duration: float,
+                   stop_on_throttle: bool = True, **kwargs: Any) -> LoadResult:
+        """Step the rate through ``steps`` and find where throttling starts"""
+        result = LoadResult(url=url, steps=[])
+        for rps in steps:
+            step = await self.open_loop(method, url, rps, step_duration, **kwargs)
+            result.steps.append(step)
+            if step.is_throttled(self.throttle_ratio):
+                result.throttle_rps = rps
+                if stop_on_throttle:
+                    break
+        return result
+
+    async def _send(self, step: LoadStep, method: str, url: str, **kwargs: Any) -> None:
+        started = time.monotonic()
+        try:
+            response = await self.client.request(method, url, throttled=False, coalesce=False, **kwargs)
+        except Exception:
+            step.errors += 1
+            return
+        step.latency.record(time.monotonic() - started)
+        step.statuses[response.status] += 1
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            step.retry_after = max(step.retry_after or 0.0, retry_after)
@@ -1,10 +1,13 @@
 """
 Core data models for AISS
 """
-from dataclasses import dataclass
 from enum import Enum
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple, Union
+import hashlib
+import sys
+import weakref
+import zlib
 
 class SeverityLevel(Enum):
     CRITICAL = "CRITICAL"
@@ -13,11 +16,187 @@ class SeverityLevel(Enum):
     LOW = "LOW"
     INFO = "INFO"
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+
+def timestamp_to_micros(timestamp: str) -> Optional[int]:
+    """Naive ISO timestamp as microseconds since the epoch.
+
+    Returns None when the text would not come back unchanged from
+    ``micros_to_timestamp`` (empty, date-only, with an offset, ...).
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != timestamp:
+        return None
+    delta = parsed - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def micros_to_datetime(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+def micros_to_timestamp(micros: int) -> str:
+    return micros_to_datetime(micros).isoformat()
+
+class Proof:
+    """Finding proof text held out of line, shared by identical proofs.
+
+    Proofs are deduplicated by content hash while any finding refers to
+    them, and long ones are kept zlib-compressed.
+    """
+    __slots__ = ("digest", "_data", "__weakref__")
+
+    # Proofs longer than this are stored compressed
+    COMPRESS_OVER = 512
+    _registry: "weakref.WeakValueDictionary[bytes, Proof]" = weakref.WeakValueDictionary()
+
+    def __init__(self, digest: bytes, text: str):
+        self.digest = digest
+        data: Union[str, bytes] = text
+        if len(text) > self.COMPRESS_OVER:
+            data = zlib.compress(text.encode("utf-8", "surrogatepass"))
+        self._data = data
+
+    @classmethod
+    def of(cls, text: str) -> 'Proof':
+        """Shared proof object for ``text``"""
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        proof = cls._registry.get(digest)
+        if proof is None:
+            proof = cls._registry[digest] = cls(digest, text)
+        return proof
+
+    @property
+    def text(self) -> str:
+        if isinstance(self._data, bytes):
+            return zlib.decompress(self._data).decode("utf-8", "surrogatepass")
+        return self._data
+
 class Finding:
-    severity: SeverityLevel
-    title: str
-    description: str
-    proof: str
-    remediation: str
-    timestamp: str
\ No newline at end of file
+    """One security finding.
+
+    Behaves like a plain record of ``severity``, ``title``, ``description``,
+    ``proof``, ``remediation`` and ``timestamp``, but is stored compactly
+    for fleet scans producing millions of findings: slots instead of a
+    dict, the short labels (title, module, check) interned, the timestamp
+    kept as integer microseconds, and the proof held out of line in a
+    shared ``Proof``. Description and remediation may carry per-target
+    text, and interned strings are never freed, so they are left as is.
+
+    ``module``, ``check`` and ``target`` identify where a finding came
+    from; they are optional and used to aggregate findings across targets.
+    """
+    __slots__ = ("severity", "title", "description", "remediation", "_proof", "_timestamp",
+                 "module", "check", "target")
+
+    def __init__(self, severity: SeverityLevel, title: str, description: str, proof: str,
+                 remediation: str, timestamp: str, module: str = "", check: str = "",
+                 target: str = ""):
+        self.severity = severity
+        self.title = sys.intern(title)
+        self.description = description
+        self.remediation = remediation
+        self.proof = proof
+        self.timestamp = timestamp
+        self.module = sys.intern(module)
+        self.check = sys.intern(check)
+        self.target = target
+
+    @property
+    def proof(self) -> str:
+        return self._proof.text if self._proof is not None else ""
+
+    @proof.setter
+    def proof(self, value: str) -> None:
+        self._proof = Proof.of(value) if value else None
+
+    @property
+    def proof_ref(self) -> Optional[Proof]:
+        """Shared proof object, for stores that keep proofs by reference"""
+        return self._proof
+
+    @property
+    def timestamp(self) -> str:
+        value = self._timestamp
+        if value is None:
+            return ""
+        if isinstance(value, int):
+            return micros_to_timestamp(value)
+        return value
+
+    @timestamp.setter
+    def timestamp(self, value: str) -> None:
+        micros = timestamp_to_micros(value) if value else None
+        # Text that does not round-trip through the number is kept as is
+        self._timestamp = micros if micros is not None else (value or None)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.severity is other.severity and self.title == other.title
+                and self.description == other.description
+                and self.remediation == other.remediation
+                and self._proof_digest() == other._proof_digest()
+                and self._timestamp == other._timestamp and self.module == other.module
+                and self.check == other.check and self.target == other.target)
+
+    def _proof_digest(self) -> Optional[bytes]:
+        return self._proof.digest if self._proof is not None else None
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (f"Finding(severity={self.severity!r}, title={self.title!r}, "
+                f"description={self.description!r}, proof={self.proof!r}, "
+                f"remediation={self.remediation!r}, timestamp={self.timestamp!r}, "
+                f"module={self.module!r}, check={self.check!r}, target={self.target!r})")
+
+    def __reduce__(self):
+        # Rebuild through the constructor so labels are re-interned and
+        # proofs deduplicated in the receiving process
+        return (self.__class__, (self.severity, self.title, self.description, self.proof,
+                                 self.remediation, self.timestamp, self.module, self.check,
+                                 self.target))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert finding to a JSON-serializable dictionary"""
+        data = {
+            "severity": self.severity.value,
+            "title": self.title,
+            "description": self.description,
+            "proof": self.proof,
+            "remediation": self.remediation,
+            "timestamp": self.timestamp
+        }
+        for key in ("module", "check", "target"):
+            value = getattr(self, key)
+            if value:
+                data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Finding':
+        """Rebuild a finding from ``to_dict`` output"""
+        return cls(
+            severity=SeverityLevel(data["severity"]),
+            title=data["title"],
+            description=data["description"],
+            proof=data.get("proof") or "",
+            remediation=data["remediation"],
+            timestamp=data.get("timestamp") or "",
+            module=data.get("module") or "",
+            check=data.get("check") or "",
+            target=data.get("target") or ""
+        )
+
+    def to_tuple(self) -> Tuple[str, ...]:
+        """Compact positional form used to ship findings between processes"""
+        return (self.severity.value, self.title, self.description, self.proof,
+                self.remediation, self.timestamp, self.module, self.check, self.target)
+
+    @classmethod
+    def from_tuple(cls, data: Tuple[str, ...]) -> 'Finding':
+        """Rebuild a finding from ``to_tuple`` output"""
+        severity, *rest = data
+        return cls(SeverityLevel(severity), *rest)
@@ -1,43 +1,180 @@
 """
 Core scanner implementation
 """
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterable, List, Dict, Any, Optional
 from datetime import datetime
+from functools import partial
 import asyncio
+from .coalesce import ProbeMemo, current_probes
 from .config import AISSConfig
+from .http import HTTPClient
+from .leaks import LeakScorer, current_scorer
 from .models import Finding, SeverityLevel
-from ..modules.api_test import APISecurityTester
-from ..modules.agent_test import AgentResponseTester
+from .tracing import TimingStats, current_stats
+from ..modules.registry import PREREQUISITES, ModuleSpec, registry
 
 class SecurityScanner:
-    def __init__(self, target: Optional[str] = None, config: Optional[AISSConfig] = None):
+    def __init__(self, target: Optional[str] = None, config: Optional[AISSConfig] = None,
+                 client: Optional[HTTPClient] = None,
+                 on_finding: Optional[Callable[[Finding], None]] = None):
         self.target = target
         self.config = config or AISSConfig()
+        # Fleet scans pass in a client shared across targets
+        self.client = client
+        # Streaming scans hand each finding over as soon as a tester
+        # produces it; the results then carry only the summary
+        self.on_finding = on_finding
         
     async def run_scan(self) -> Dict[str, Any]:
         """Run all security tests"""
         if not self.target:
             raise ValueError("Target URL is required for scanning")
             
-        findings = []
-        
-        # Run API Security Tests
-        api_tester = APISecurityTester(self.target)
-        api_findings = await api_tester.run_tests()
-        findings.extend(api_findings)
-        
-        # Run Agent Response Tests
-        agent_tester = AgentResponseTester(self.target)
-        agent_findings = await agent_tester.run_tests()
-        findings.extend(agent_findings)
+        # Request timings are collected per module for this scan only
+        stats = TimingStats()
+        summary = {level: 0 for level in SeverityLevel}
+        skipped: Dict[str, str] = {}
+        # Identical idempotent probes of this scan go out once, whichever
+        # modules send them
+        probes = ProbeMemo()
+        # Reply tokens are scored for leaked secrets in batches across modules
+        scorer = LeakScorer.from_config(self.config.scan)
+        token = current_stats.set(stats)
+        probes_token = current_probes.set(probes)
+        scorer_token = current_scorer.set(scorer)
+        try:
+            # One keep-alive pool for the whole scan, shared by every tester
+            if self.client is not None:
+                findings = await self._run_modules(self.client, summary, skipped)
+                throttle = self._throttle_state(self.client)
+            else:
+                async with HTTPClient(self.config.scan) as client:
+                    findings = await self._run_modules(client, summary, skipped)
+                    throttle = self._throttle_state(client)
+        finally:
+            current_scorer.reset(scorer_token)
+            current_probes.reset(probes_token)
+            current_stats.reset(token)
         
         return {
             "timestamp": datetime.utcnow().isoformat(),
             "target": self.target,
             "findings": findings,
-            "summary": self._generate_summary(findings)
+            "summary": summary,
+            "timings": stats.summary(),
+            "throttle": throttle,
+            "skipped": skipped,
+            "coalesced": probes.snapshot(),
+            "leak_scoring": scorer.snapshot()
+        }
+        
+    async def run_self_check(self, paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Scan this agent's workspace, memory and config files for stored secrets"""
+        from .selfcheck import SelfChecker
+
+        checker = SelfChecker(self.config.self_check)
+        paths = list(paths or self.config.self_check.paths)
+        # File scanning blocks; keep it off the event loop
+        result = await asyncio.get_running_loop().run_in_executor(None, checker.run, paths)
+        if self.on_finding is not None:
+            for finding in result.findings:
+                self.on_finding(finding)
+
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "target": ", ".join(paths),
+            "findings": [] if self.on_finding is not None else result.findings,
+            "summary": self._generate_summary(result.findings),
+            "files": result.stats(),
+            "errors": [{"path": path, "error": error} for path, error in result.errors]
         }
         
+    def _throttle_state(self, client: HTTPClient) -> Optional[Dict[str, Any]]:
+        """Probe rate the adaptive throttle settled on for the target"""
+        if client.throttle is None:
+            return None
+        host = client.throttle.hosts.get(client.host_key(self.target))
+        return host.snapshot() if host is not None else None
+        
+    async def _run_modules(self, client: HTTPClient, summary: Dict[SeverityLevel, int],
+                           skipped: Dict[str, str]) -> List[Finding]:
+        """Run the planned test modules, counting findings in ``summary``.
+
+        Each module starts once the modules it comes after have finished
+        and its prerequisites hold; independent modules run concurrently,
+        most expensive first, at most ``module_concurrency`` at a time. A
+        failed prerequisite is checked once, reported as one finding, and
+        the modules needing it are recorded in ``skipped`` instead of run.
+        """
+        specs = registry.plan(self.config.scan.modules)
+        slots = asyncio.Semaphore(max(1, self.config.scan.module_concurrency))
+        checks: Dict[str, asyncio.Task] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        failures: List[Finding] = []
+
+        def emit(module: str, finding: Finding) -> None:
+            summary[finding.severity] += 1
+            self.on_finding(self._tag(finding, module))
+
+        async def check(name: str) -> Optional[str]:
+            prerequisite = PREREQUISITES[name]
+            reason = await prerequisite.check(client, self.target)
+            if reason is not None:
+                finding = Finding(
+                    severity=prerequisite.severity,
+                    title=prerequisite.title,
+                    description=f"Prerequisite '{name}' failed: {reason}",
+                    proof=f"{name} check against {self.target}: {reason}",
+                    remediation=prerequisite.remediation,
+                    timestamp=datetime.utcnow().isoformat(),
+                    check=name
+                )
+                if self.on_finding is not None:
+                    emit("scanner", finding)
+                else:
+                    failures.append(self._tag(finding, "scanner"))
+            return reason
+
+        async def run(spec: ModuleSpec) -> List[Finding]:
+            for dependency in spec.after:
+                await tasks[dependency]
+            for requirement in spec.requires:
+                if requirement not in checks:
+                    checks[requirement] = asyncio.ensure_future(check(requirement))
+                reason = await checks[requirement]
+                if reason is not None:
+                    skipped[spec.name] = f"{requirement}: {reason}"
+                    return []
+
+            async with slots:
+                tester = spec.load()(self.target, client=client)
+                if self.on_finding is None:
+                    return [self._tag(finding, spec.name) for finding in await tester.run_tests()]
+                # Payload probes stream through ``emit`` themselves; other
+                # checks return their findings when the module finishes
+                tester.on_finding = partial(emit, spec.name)
+                for finding in await tester.run_tests():
+                    emit(spec.name, finding)
+                return []
+
+        # Tasks are all created before any runs, so dependencies can be awaited
+        for spec in sorted(specs, key=lambda spec: -spec.cost):
+            tasks[spec.name] = asyncio.ensure_future(run(spec))
+        # Results are collected in plan order so reports stay stable between runs
+        results = await asyncio.gather(*(tasks[spec.name] for spec in specs))
+
+        if self.on_finding is not None:
+            return []
+        findings = failures + [finding for module_findings in results for finding in module_findings]
+        summary.update(self._generate_summary(findings))
+        return findings
+        
+    def _tag(self, finding: Finding, module: str) -> Finding:
+        """Record which module and target produced a finding, for aggregation"""
+        finding.module = finding.module or module
+        finding.target = finding.target or self.target
+        return finding
+        
     def _generate_summary(self, findings: List[Finding]) -> Dict[str, int]:
         """Generate severity summary"""
         summary = {level: 0 for level in SeverityLevel}
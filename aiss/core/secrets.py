@@ -0,0 +1,304 @@
+"""
+Known key formats and secret redaction
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+import mmap
+import re
+from .models import SeverityLevel
+
+@dataclass(frozen=True)
+class KeyFormat:
+    """A recognisable credential format.
+
+    ``pattern`` must match the whole credential, starting with one of the
+    literal ``prefixes``; a named group ``value`` marks the secret part
+    when the pattern also matches its surroundings (``api_key = ...``),
+    and only that part is redacted. With ``ignore_case`` the prefixes are
+    given in lower case and matched in any case.
+
+    Every distinct prefix costs a substring search over all scanned data,
+    and every occurrence of it a pattern match, so prefixes are few and
+    short but not common words; formats may share them.
+    """
+    name: str
+    label: str
+    prefixes: Tuple[str, ...]
+    pattern: str
+    severity: SeverityLevel
+    ignore_case: bool = False
+    _text: Pattern = field(init=False, repr=False, compare=False)
+    _bytes: Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        flags = re.IGNORECASE if self.ignore_case else 0
+        object.__setattr__(self, "_text", re.compile(self.pattern, flags))
+        object.__setattr__(self, "_bytes", re.compile(self.pattern.encode(), flags))
+
+    def compiled(self, binary: bool) -> Pattern:
+        return self._bytes if binary else self._text
+
+# Earlier formats win when several match at the same offset
+KEY_FORMATS = (
+    KeyFormat("private_key", "private key", ("-----BEGIN ",),
+              r"-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----",
+              SeverityLevel.CRITICAL),
+    KeyFormat("anthropic_key", "Anthropic API key", ("sk",),
+              r"sk-ant-[A-Za-z0-9_\-]{20,200}", SeverityLevel.CRITICAL),
+    KeyFormat("openai_key", "OpenAI API key", ("sk",),
+              r"sk-(?:proj-|svcacct-|admin-)?[A-Za-z0-9_\-]{20,200}", SeverityLevel.CRITICAL),
+    # The mode marker says what the string is, so any key body counts
+    KeyFormat("stripe_key", "Stripe secret key", ("sk", "rk_"),
+              r"[rs]k_(?:live|test)_[A-Za-z0-9]{3,200}", SeverityLevel.CRITICAL),
+    KeyFormat("aws_access_key", "AWS access key ID", ("AKIA", "ASIA"),
+              r"(?:AKIA|ASIA)[A-Z0-9]{16}(?![A-Za-z0-9])", SeverityLevel.CRITICAL),
+    KeyFormat("github_token", "GitHub token", ("gh",),
+              r"(?:gh[pousr]_[A-Za-z0-9]{36,200}|github_pat_[A-Za-z0-9_]{22,200})",
+              SeverityLevel.CRITICAL),
+    KeyFormat("slack_token", "Slack token", ("xox",),
+              r"xox[abprs]-[A-Za-z0-9\-]{10,200}", SeverityLevel.HIGH),
+    KeyFormat("google_api_key", "Google API key", ("AIza",),
+              r"AIza[A-Za-z0-9_\-]{35}", SeverityLevel.HIGH),
+    KeyFormat("jwt", "JSON Web Token", ("eyJ",),
+              r"eyJ[A-Za-z0-9_\-]{10,2000}\.eyJ[A-Za-z0-9_\-]{10,4000}\.[A-Za-z0-9_\-]{10,1000}",
+              SeverityLevel.HIGH),
+    KeyFormat("assigned_secret", "hard-coded credential",
+              ("api", "secret", "client", "access", "auth", "passw"),
+              r"(?:api[_\-]?key|secret[_\-]?key|client[_\-]?secret|access[_\-]?token|auth[_\-]?token"
+              r"|password|passwd)[\"']?[ \t]*[:=][ \t]*[\"']?(?P<value>[^\s\"',;]{8,200})",
+              SeverityLevel.MEDIUM, ignore_case=True),
+)
+
+FORMATS_BY_NAME = {key_format.name: key_format for key_format in KEY_FORMATS}
+
+# Each distinct prefix is searched once: (prefix, ignore_case) -> format ranks
+_PREFIXES: Dict[Tuple[str, bool], List[int]] = {}
+for _rank, _key_format in enumerate(KEY_FORMATS):
+    for _prefix in _key_format.prefixes:
+        _PREFIXES.setdefault((_prefix, _key_format.ignore_case), []).append(_rank)
+
+# Longest credential (or credential assignment) the patterns can match;
+# scans split into ranges overlap by this much
+MAX_SECRET_CHARS = 8192
+# Buffers other than str and bytes (memory maps) are searched this many
+# bytes at a time
+WINDOW_BYTES = 4194304
+
+_TOKEN_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+_TOKEN = frozenset(_TOKEN_CHARS) | frozenset(_TOKEN_CHARS.encode())
+
+class SecretMatch(NamedTuple):
+    """A credential found in text or bytes; ``start``/``end`` span the secret value"""
+    kind: str
+    start: int
+    end: int
+    value: str
+
+def _anchors(buf: Union[str, bytes], begin: int, stop: int) -> List[Tuple[int, int]]:
+    """Offsets in ``buf[begin:stop]`` where a format's prefix starts, with the format's rank"""
+    binary = isinstance(buf, bytes)
+    lowered = None
+    found = []
+    for (prefix, ignore_case), ranks in _PREFIXES.items():
+        haystack = buf
+        if ignore_case:
+            if lowered is None:
+                lowered = buf.lower()
+            haystack = lowered
+        needle = prefix.encode() if binary else prefix
+        pos = haystack.find(needle, begin, stop)
+        while pos >= 0:
+            # A credential must not start in the middle of a token
+            if pos == 0 or buf[pos - 1] not in _TOKEN:
+                found.extend((pos, rank) for rank in ranks)
+            pos = haystack.find(needle, pos + 1, stop)
+    found.sort()
+    return found
+
+def _windows(data: Union[str, bytes, bytearray, memoryview, mmap.mmap],
+             start: int, end: int) -> Iterator[Tuple[int, Union[str, bytes], int, int]]:
+    """``(base, buffer, begin, stop)`` pieces of ``data[start:end]`` to search.
+
+    Each buffer starts one character before its piece, for the token
+    check, and runs ``MAX_SECRET_CHARS`` past it, so a credential starting
+    near the end of a piece is matched whole.
+    """
+    if isinstance(data, (str, bytes)):
+        yield 0, data, start, end
+        return
+    for offset in range(start, end, WINDOW_BYTES):
+        base = max(0, offset - 1)
+        buf = bytes(data[base:min(len(data), offset + WINDOW_BYTES + MAX_SECRET_CHARS)])
+        yield base, buf, offset - base, min(end, offset + WINDOW_BYTES) - base
+
+def find_secrets(data: Union[str, bytes, bytearray, memoryview, mmap.mmap],
+                 start: int = 0, end: int = -1) -> Iterator[SecretMatch]:
+    """Credentials of a known format starting in ``data[start:end]``.
+
+    Accepts text or any bytes-like buffer, including a memory map. Rather
+    than trying every pattern at every offset, the literal prefixes of all
+    formats are located by substring search and a format's pattern is
+    only tried where one of its prefixes occurs.
+    """
+    if end < 0:
+        end = len(data)
+    for base, buf, begin, stop in _windows(data, start, end):
+        binary = isinstance(buf, bytes)
+        last_end = matched_at = -1
+        for pos, rank in _anchors(buf, begin, stop):
+            if pos < last_end or pos == matched_at:
+                continue
+            key_format = KEY_FORMATS[rank]
+            match = key_format.compiled(binary).match(buf, pos)
+            if match is None:
+                continue
+            last_end = match.end()
+            # Lower ranked formats anchored at the same offset lose
+            matched_at = pos
+            span = match.span("value") if "value" in match.re.groupindex else match.span()
+            value = buf[span[0]:span[1]]
+            if binary:
+                value = value.decode("utf-8", "replace")
+            yield SecretMatch(key_format.name, base + span[0], base + span[1], value)
+
+# Formats whose credentials are single tokens
+_TOKEN_FORMATS = tuple(key_format for key_format in KEY_FORMATS
+                       if not key_format.ignore_case and " " not in key_format.pattern)
+
+_TOKEN_PREFIXES = tuple({prefix for key_format in _TOKEN_FORMATS for prefix in key_format.prefixes})
+
+def key_format_of(token: str) -> Optional[KeyFormat]:
+    """Key format of a single token, when the whole token is a credential"""
+    if not token.startswith(_TOKEN_PREFIXES):
+        return None
+    for key_format in _TOKEN_FORMATS:
+        if token.startswith(key_format.prefixes) and key_format.compiled(False).fullmatch(token):
+            return key_format
+    return None
+
+# Indicators that name a credential without being one
+CREDENTIAL_WORDS = frozenset({"api_key", "apikey", "api key", "key", "token", "password", "passwd",
+                              "secret", "credential", "credentials"})
+
+_CANDIDATE_CHARS = frozenset(_TOKEN_CHARS + "+/.=")
+_CANDIDATE_RE = re.compile(r"[A-Za-z0-9_\-+/.]{8,}=*")
+
+class Candidate(NamedTuple):
+    """A token that may be a secret; ``kind`` is its key format, if any"""
+    offset: int
+    token: str
+    kind: Optional[str]
+
+class TokenCollector:
+    """Candidate secret tokens of a body streamed in chunks.
+
+    Tokens are runs of key characters (letters, digits, ``_-+/.`` and
+    trailing ``=`` padding); a token cut by a chunk boundary is carried
+    over to the next chunk. Tokens of a known key format are always kept,
+    other tokens only from ``min_length`` characters, for entropy scoring
+    later (see ``aiss.core.leaks``). Each kind is capped at
+    ``max_candidates``, so ordinary long words cannot crowd out a key and
+    memory stays bounded whatever the body size.
+    """
+
+    def __init__(self, min_length: int = 20, max_candidates: int = 64, max_token: int = 512):
+        self.min_length = min_length
+        self.max_candidates = max_candidates
+        self.max_token = max_token
+        self.candidates: List[Candidate] = []
+        self.formatted = 0
+        self._unformatted = 0
+        self._carry = ""
+        self._consumed = 0
+
+    def feed(self, text: str) -> None:
+        text = self._carry + text
+        cut = len(text)
+        while cut and text[cut - 1] in _CANDIDATE_CHARS and len(text) - cut < self.max_token:
+            cut -= 1
+        self._scan(text, cut)
+        self._carry = text[cut:]
+        self._consumed += cut
+
+    def tokens(self) -> List[Candidate]:
+        """Candidates in everything fed so far, including a trailing token"""
+        if self._carry:
+            self._scan(self._carry, len(self._carry))
+            self._consumed += len(self._carry)
+            self._carry = ""
+        return self.candidates
+
+    def _scan(self, text: str, end: int) -> None:
+        for match in _CANDIDATE_RE.finditer(text, 0, end):
+            token = match.group()
+            # Dots also end sentences
+            stripped = token.strip(".")
+            if not stripped:
+                continue
+            offset = self._consumed + match.start() + token.index(stripped[0])
+            token = stripped[:self.max_token]
+            key_format = key_format_of(token)
+            if key_format is not None:
+                if self.formatted >= self.max_candidates:
+                    continue
+                self.formatted += 1
+            elif len(token) < self.min_length or self._unformatted >= self.max_candidates:
+                continue
+            else:
+                self._unformatted += 1
+            self.candidates.append(Candidate(offset, token, key_format.name if key_format else None))
+
+def redact(value: str, keep: int = 4) -> str:
+    """Enough of a secret to recognise it, never enough to use it"""
+    if len(value) <= keep * 2:
+        return "[REDACTED]"
+    return f"{value[:keep]}...[REDACTED {len(value)} chars]"
+
+def redact_text(text: str) -> str:
+    """``text`` with every credential of a known format redacted"""
+    parts = []
+    last = 0
+    for match in find_secrets(text):
+        parts.append(text[last:match.start])
+        parts.append(redact(match.value))
+        last = match.end
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return "".join(parts)
+
+_FRAGMENT_RE = re.compile(r"[A-Za-z0-9_\-+/.=]{4,}")
+
+def redact_values(text: str, values: Iterable[str]) -> str:
+    """``text`` with known secret values redacted, including fragments of
+    them cut off at the start or end of an excerpt"""
+    # Longest first, so a value containing another is redacted whole
+    values = sorted({value for value in values if value}, key=len, reverse=True)
+    if not values:
+        return text
+
+    def replace(match: 're.Match') -> str:
+        token = match.group()
+        # The ellipsis marking the cut is not part of the fragment
+        core = token.strip(".")
+        lead = token[:len(token) - len(token.lstrip("."))]
+        trail = token[len(lead) + len(core):]
+        for value in values:
+            for size in range(min(len(core), len(value) - 1), 3, -1):
+                if core.endswith(value[:size]):
+                    return lead + core[:-size] + redact(value[:size]) + trail
+                if core.startswith(value[-size:]):
+                    return lead + redact(value[-size:]) + core[size:] + trail
+        return token
+
+    # Whole values are replaced as they are, whatever surrounds them; only
+    # the text between them is searched for fragments cut off by the excerpt
+    whole = re.compile("|".join(map(re.escape, values)))
+    parts = []
+    last = 0
+    for match in whole.finditer(text):
+        parts.append(_FRAGMENT_RE.sub(replace, text[last:match.start()]))
+        parts.append(redact(match.group()))
+        last = match.end()
+    parts.append(_FRAGMENT_RE.sub(replace, text[last:]))
+    return "".join(parts)
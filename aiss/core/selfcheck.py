@@ -0,0 +1,405 @@
+"""
+Self-check: scanning an agent's own files for stored secrets
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import sqlite3
+import stat
+import time
+from .models import Finding, SeverityLevel
+from .secrets import FORMATS_BY_NAME, MAX_SECRET_CHARS, find_secrets, redact
+
+if TYPE_CHECKING:
+    from .config import SelfCheckConfig
+
+# Leading bytes checked for NULs to tell binary files from text
+SNIFF_BYTES = 8192
+# Matches kept per scanned range; a log repeating one key is one finding anyway
+MAX_MATCHES_PER_RANGE = 100
+# Matches listed in a finding's proof
+PROOF_MATCHES = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    binary INTEGER NOT NULL,
+    seen INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    path TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    matches TEXT NOT NULL,
+    PRIMARY KEY (path, start)
+) WITHOUT ROWID;
+"""
+
+class FileEntry(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    mode: int
+
+class RangeScan(NamedTuple):
+    """Outcome of scanning ``path`` from ``start``.
+
+    ``matches`` holds ``(kind, offset, redacted value)`` triples, or None
+    when the range's digest shows it is unchanged since the last run.
+    """
+    path: str
+    start: int
+    digest: bytes
+    binary: bool
+    matches: Optional[List[Tuple[str, int, str]]]
+    error: Optional[str] = None
+
+def _is_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+def _scan_range(task: Tuple[str, int, int, Optional[bytes]]) -> RangeScan:
+    """Hash and scan one byte range of a file through a memory map.
+
+    Run in worker processes, so it takes and returns plain tuples. A
+    secret crossing into the next range is found whole and reported by
+    the range it starts in, so the digest also covers the
+    ``MAX_SECRET_CHARS`` after the range that such a secret can reach into.
+    """
+    path, start, end, known = task
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if start >= size:
+                return RangeScan(path, start, b"", False, [])
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                end = min(end, size)
+                if start == 0 and _is_binary(data[:SNIFF_BYTES]):
+                    return RangeScan(path, start, b"", True, None)
+                with memoryview(data) as view, \
+                        view[start:min(size, end + MAX_SECRET_CHARS)] as part:
+                    digest = hashlib.blake2b(part, digest_size=16).digest()
+                if digest == known:
+                    return RangeScan(path, start, digest, False, None)
+                matches = []
+                for match in find_secrets(data, start, end):
+                    matches.append((match.kind, match.start, redact(match.value)))
+                    if len(matches) >= MAX_MATCHES_PER_RANGE:
+                        break
+                return RangeScan(path, start, digest, False, matches)
+    except (OSError, ValueError) as e:
+        return RangeScan(path, start, b"", False, [], str(e) or type(e).__name__)
+
+class ScanIndex:
+    """Content-hash index of previously scanned files.
+
+    Files are recorded with their size and modification time, and each
+    range of them with a digest and the (redacted) matches found in it.
+    A file whose size and mtime are unchanged is not read again; a changed
+    file is rehashed range by range and only ranges whose digest differs
+    are rescanned, so an appended conversation log costs one range.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.open()
+        return self._db
+
+    def file(self, path: str) -> Optional[Tuple[int, int, bool]]:
+        """Recorded size, mtime and binary flag of ``path``"""
+        row = self.db.execute("SELECT size, mtime_ns, binary FROM files WHERE path = ?",
+                              (path,)).fetchone()
+        return (row[0], row[1], bool(row[2])) if row is not None else None
+
+    def chunks(self, path: str) -> Dict[int, Tuple[bytes, List[Tuple[str, int, str]]]]:
+        """Digest and matches of each recorded range of ``path`` by start offset"""
+        return {
+            start: (digest, [tuple(match) for match in json.loads(matches)])
+            for start, digest, matches in self.db.execute(
+                "SELECT start, digest, matches FROM chunks WHERE path = ?", (path,))
+        }
+
+    def touch(self, paths: Iterable[str], seen: int) -> None:
+        self.db.executemany("UPDATE files SET seen = ? WHERE path = ?",
+                            ((seen, path) for path in paths))
+
+    def store(self, entry: FileEntry, binary: bool, seen: int,
+              chunks: Iterable[Tuple[int, bytes, List[Tuple[str, int, str]]]]) -> None:
+        self.db.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, binary, seen) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (entry.path, entry.size, entry.mtime_ns, int(binary), seen))
+        self.db.execute("DELETE FROM chunks WHERE path = ?", (entry.path,))
+        self.db.executemany(
+            "INSERT INTO chunks (path, start, digest, matches) VALUES (?, ?, ?, ?)",
+            ((entry.path, start, digest, json.dumps(matches)) for start, digest, matches in chunks)
+        )
+
+    def prune(self, roots: Iterable[str], seen: int) -> None:
+        """Forget files under ``roots`` that were not found by the run ``seen``"""
+        for root in roots:
+            prefix = root.rstrip(os.sep) + os.sep
+            stale = [path for (path,) in self.db.execute(
+                "SELECT path FROM files WHERE seen != ? AND (path = ? OR substr(path, 1, ?) = ?)",
+                (seen, root, len(prefix), prefix))]
+            self.db.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in stale))
+            self.db.executemany("DELETE FROM chunks WHERE path = ?", ((path,) for path in stale))
+
+@dataclass
+class SelfCheckResult:
+    findings: List[Finding] = field(default_factory=list)
+    files: int = 0
+    scanned: int = 0
+    reused: int = 0
+    binary: int = 0
+    excluded: int = 0
+    bytes_scanned: int = 0
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+    duration: float = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "scanned": self.scanned,
+            "reused": self.reused,
+            "binary": self.binary,
+            "excluded": self.excluded,
+            "bytes_scanned": self.bytes_scanned,
+            "errors": len(self.errors),
+            "duration": round(self.duration, 3),
+        }
+
+class SelfChecker:
+    """Secret scanner for an agent's workspace, memory and config files.
+
+    Directories are walked without following symlinks, skipping excluded
+    names and paths. Files are read through memory maps; binaries (a NUL
+    in the first ``SNIFF_BYTES``) are skipped. Files larger than
+    ``chunk_bytes`` are split into ranges, and once there is more than
+    ``parallel_min_bytes`` to scan the ranges are spread over a process
+    pool. With the index enabled, repeat runs only rescan what changed.
+    """
+
+    def __init__(self, config: 'SelfCheckConfig'):
+        self.config = config
+        self.index = ScanIndex(config.index_path) if config.index_enabled else None
+
+    @property
+    def workers(self) -> int:
+        return self.config.workers if self.config.workers > 0 else (os.cpu_count() or 1)
+
+    def _excluded(self, name: str, relative: str) -> bool:
+        for pattern in self.config.exclude:
+            if fnmatch(relative if "/" in pattern else name, pattern):
+                return True
+        return False
+
+    def walk(self, roots: Iterable[str], result: SelfCheckResult) -> Iterator[FileEntry]:
+        """Regular files under ``roots`` that are not excluded"""
+        index_path = os.path.abspath(self.index.path) if self.index is not None else None
+        for root in roots:
+            try:
+                st = os.stat(root)
+            except OSError as e:
+                result.errors.append((root, str(e)))
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield FileEntry(root, st.st_size, st.st_mtime_ns, st.st_mode)
+                continue
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    entries = os.scandir(directory)
+                except OSError as e:
+                    result.errors.append((directory, str(e)))
+                    continue
+                with entries:
+                    for entry in entries:
+                        relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                        if self._excluded(entry.name, relative) or (
+                                index_path is not None and entry.path.startswith(index_path)):
+                            result.excluded += 1
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError as e:
+                            result.errors.append((entry.path, str(e)))
+                            continue
+                        if self.config.max_file_bytes and st.st_size > self.config.max_file_bytes:
+                            result.excluded += 1
+                            continue
+                        yield FileEntry(entry.path, st.st_size, st.st_mtime_ns, st.st_mode)
+
+    def run(self, paths: Optional[Iterable[str]] = None) -> SelfCheckResult:
+        """Scan ``paths`` (default: the configured paths) for stored secrets"""
+        started = time.perf_counter()
+        paths = list(paths or self.config.paths)
+        if not paths:
+            # Never fall back to the working directory: it is rarely the agent's
+            raise ValueError("No self-check paths given; pass them or set self_check.paths")
+        roots = [os.path.abspath(os.path.expanduser(path)) for path in paths]
+        result = SelfCheckResult()
+        seen = time.time_ns()
+        chunk_bytes = max(1, self.config.chunk_bytes)
+        try:
+            if self.index is not None:
+                # One transaction for the run; an interrupted run changes nothing
+                self.index.db.execute("BEGIN")
+            changed: List[Tuple[FileEntry, Dict[int, Tuple[bytes, List[Tuple[str, int, str]]]]]] = []
+            tasks: List[Tuple[str, int, int, Optional[bytes]]] = []
+            unchanged: List[str] = []
+            for entry in self.walk(roots, result):
+                result.files += 1
+                known = self.index.file(entry.path) if self.index is not None else None
+                if known is not None and known[:2] == (entry.size, entry.mtime_ns):
+                    unchanged.append(entry.path)
+                    result.reused += 1
+                    if known[2]:
+                        result.binary += 1
+                        continue
+                    matches = [match for _, found in self.index.chunks(entry.path).values()
+                               for match in found]
+                    result.findings.extend(self._findings(entry, matches))
+                    continue
+                if entry.size > chunk_bytes and self._sniff_binary(entry.path):
+                    result.binary += 1
+                    if self.index is not None:
+                        self.index.store(entry, True, seen, ())
+                    continue
+                stored = self.index.chunks(entry.path) if self.index is not None else {}
+                changed.append((entry, stored))
+                for start in range(0, max(entry.size, 1), chunk_bytes):
+                    known_digest = stored[start][0] if start in stored else None
+                    tasks.append((entry.path, start, start + chunk_bytes, known_digest))
+
+            if self.index is not None:
+                self.index.touch(unchanged, seen)
+            scans = self._scan(tasks, sum(entry.size for entry, _ in changed))
+
+            by_path: Dict[str, List[RangeScan]] = {}
+            for scan in scans:
+                by_path.setdefault(scan.path, []).append(scan)
+            for entry, stored in changed:
+                ranges = by_path.get(entry.path, [])
+                errors = [scan.error for scan in ranges if scan.error]
+                if errors:
+                    result.errors.append((entry.path, errors[0]))
+                    continue
+                if any(scan.binary for scan in ranges):
+                    result.binary += 1
+                    if self.index is not None:
+                        self.index.store(entry, True, seen, ())
+                    continue
+                result.scanned += 1
+                chunks = []
+                for scan in ranges:
+                    if scan.matches is None:
+                        matches = stored[scan.start][1]
+                    else:
+                        matches = scan.matches
+                        result.bytes_scanned += min(chunk_bytes, entry.size - scan.start)
+                    chunks.append((scan.start, scan.digest, matches))
+                if self.index is not None:
+                    self.index.store(entry, False, seen, chunks)
+                result.findings.extend(self._findings(entry, [m for _, _, found in chunks for m in found]))
+
+            if self.index is not None:
+                self.index.prune(roots, seen)
+                self.index.db.execute("COMMIT")
+        finally:
+            if self.index is not None:
+                self.index.close()
+        result.duration = time.perf_counter() - started
+        return result
+
+    @staticmethod
+    def _sniff_binary(path: str) -> bool:
+        try:
+            with open(path, "rb") as f:
+                return _is_binary(f.read(SNIFF_BYTES))
+        except OSError:
+            # Reported when the file is scanned
+            return False
+
+    def _scan(self, tasks: List[Tuple[str, int, int, Optional[bytes]]], total: int) -> List[RangeScan]:
+        """Scan ranges in this process, or in a process pool for large workloads"""
+        workers = min(self.workers, len(tasks))
+        if workers <= 1 or total < self.config.parallel_min_bytes:
+            return [_scan_range(task) for task in tasks]
+        # Batches of small files amortise the pickling round trip
+        chunksize = max(1, min(64, len(tasks) // (workers * 8)))
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(_scan_range, tasks, chunksize=chunksize))
+
+    @staticmethod
+    def _findings(entry: FileEntry, matches: List[Tuple[str, int, str]]) -> List[Finding]:
+        """One finding per kind of secret in a file, plus one for loose permissions"""
+        by_kind: Dict[str, List[Tuple[int, str]]] = {}
+        for kind, offset, preview in matches:
+            by_kind.setdefault(kind, []).append((offset, preview))
+        timestamp = datetime.utcnow().isoformat()
+        findings = []
+        for kind, hits in by_kind.items():
+            key_format = FORMATS_BY_NAME[kind]
+            proof = "\n".join(f"offset {offset}: {preview}" for offset, preview in hits[:PROOF_MATCHES])
+            if len(hits) > PROOF_MATCHES:
+                proof += f"\n... and {len(hits) - PROOF_MATCHES} more"
+            findings.append(Finding(
+                severity=key_format.severity,
+                title=f"Plaintext Secret Stored: {key_format.label}",
+                description=f"{len(hits)} {key_format.label} occurrence(s) stored in {entry.path}",
+                proof=proof,
+                remediation="Rotate the credential, keep it in a secrets manager or the "
+                            "environment, and keep it out of agent memory and logs",
+                timestamp=timestamp,
+                module="self_check",
+                check=kind,
+                target=entry.path
+            ))
+        if findings and entry.mode & 0o044:
+            findings.append(Finding(
+                severity=SeverityLevel.HIGH,
+                title="Secret File Readable by Other Users",
+                description=f"{entry.path} stores credentials and is readable beyond its owner",
+                proof=f"Mode: {stat.filemode(entry.mode)}",
+                remediation="Restrict the file to its owner (chmod 600)",
+                timestamp=timestamp,
+                module="self_check",
+                check="file_permissions",
+                target=entry.path
+            ))
+        return findings
@@ -0,0 +1,176 @@
+"""
+Client-side adaptive throttling of probes
+"""
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+import asyncio
+import time
+from .config import ScanConfig
+
+THROTTLE_STATUSES = (429, 503)
+# Latency rises smaller than this are treated as jitter, not congestion
+LATENCY_SLACK = 0.05
+# A route's baseline is the 10th percentile of its last LATENCY_WINDOW
+# latencies, so one unusually fast reply neither sets nor pins it
+LATENCY_WINDOW = 50
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """Token bucket pacing requests to one host.
+
+    Waiters queue on a lock, so tokens are handed out in arrival order and
+    a burst of probes is spread over time instead of released at once.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` (e.g. honouring Retry-After)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+class RouteLatency:
+    """Baseline (a low percentile of recent latencies) and smoothed (EWMA) latency of one route"""
+    __slots__ = ("base", "average", "recent")
+
+    def __init__(self, latency: float):
+        self.recent: Deque[float] = deque([latency], maxlen=LATENCY_WINDOW)
+        self.base = latency
+        self.average = latency
+
+    def update(self, latency: float) -> None:
+        self.recent.append(latency)
+        self.base = sorted(self.recent)[len(self.recent) // 10]
+        self.average = 0.8 * self.average + 0.2 * latency
+
+class HostThrottle:
+    """AIMD rate control for one host.
+
+    Each healthy response raises the rate additively, by about
+    ``throttle_increase`` requests/second per second of traffic. A 429/503,
+    a Retry-After header, a timeout, or latency rising past
+    ``throttle_latency_factor`` times the route's baseline multiplies
+    the rate by ``throttle_decrease``, at most once per cooldown so a burst
+    of in-flight failures counts as one congestion event.
+
+    Latency is tracked per route (method and path): a chat endpoint that
+    takes seconds to answer is not congested just because a static GET on
+    the same host answers in milliseconds.
+    """
+
+    def __init__(self, config: ScanConfig):
+        self.config = config
+        self.bucket = TokenBucket(config.throttle_initial_rate, config.throttle_burst)
+        self.routes: Dict[str, RouteLatency] = {}
+        self.backoffs = 0
+        self._last_backoff = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    async def acquire(self) -> None:
+        await self.bucket.acquire()
+
+    def _set_rate(self, rate: float) -> None:
+        now = time.monotonic()
+        self.bucket._refill(now)
+        self.bucket.rate = min(self.config.throttle_max_rate,
+                               max(self.config.throttle_min_rate, rate))
+
+    def _backoff(self) -> None:
+        now = time.monotonic()
+        # Responses already in flight at the last backoff carry stale news
+        slowest = max((route.average for route in self.routes.values()), default=0.0)
+        cooldown = max(slowest, 1.0 / self.rate)
+        if now - self._last_backoff < cooldown:
+            return
+        self._last_backoff = now
+        self.backoffs += 1
+        self._set_rate(self.rate * self.config.throttle_decrease)
+
+    def observe(self, status: int, latency: float, retry_after: Optional[float] = None,
+                route: str = "") -> None:
+        """Adjust the rate from one response to ``route``"""
+        if retry_after is not None:
+            self.bucket.pause(min(retry_after, self.config.throttle_max_pause))
+        if status in THROTTLE_STATUSES or retry_after is not None:
+            self._backoff()
+            return
+
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteLatency(latency)
+        else:
+            stats.update(latency)
+        if stats.average > stats.base * self.config.throttle_latency_factor and \
+                stats.average - stats.base > LATENCY_SLACK:
+            self._backoff()
+        else:
+            self._set_rate(self.rate + self.config.throttle_increase / self.rate)
+
+    def observe_error(self) -> None:
+        """Timeouts and dropped connections count as congestion"""
+        self._backoff()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 2),
+            "backoffs": self.backoffs,
+            "base_latency_ms": {route: round(stats.base * 1000, 1)
+                                for route, stats in sorted(self.routes.items())},
+        }
+
+class Throttle:
+    """Scanner-wide scheduler holding one adaptive throttle per host"""
+
+    def __init__(self, config: ScanConfig):
+        self.config = config
+        self.hosts: Dict[str, HostThrottle] = {}
+
+    def for_host(self, key: str) -> HostThrottle:
+        throttle = self.hosts.get(key)
+        if throttle is None:
+            throttle = self.hosts[key] = HostThrottle(self.config)
+        return throttle
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {key: throttle.snapshot() for key, throttle in sorted(self.hosts.items())}
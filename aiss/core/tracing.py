@@ -0,0 +1,220 @@
+"""
+Per-request timing instrumentation built on aiohttp tracing
+"""
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import math
+import time
+import aiohttp
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with bounded memory.
+
+    Buckets grow by 10% from 1 ms, so percentiles are accurate to within
+    one bucket width regardless of how many samples are recorded.
+    """
+
+    BASE = 0.001
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.BASE:
+            return 0
+        return int(math.log(seconds / self.BASE, self.GROWTH)) + 1
+
+    def _upper_bound(self, bucket: int) -> float:
+        return self.BASE * self.GROWTH ** bucket
+
+    def record(self, seconds: float) -> None:
+        self.buckets[self._bucket(seconds)] += 1
+        self.count += 1
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Latency in seconds below which ``pct`` percent of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+@dataclass
+class RequestTiming:
+    """Phase timings of one request, in seconds.
+
+    aiohttp reports connection setup as one phase, so for https ``connect``
+    includes the TLS handshake. ``dns`` and ``connect`` stay 0 when a
+    pooled connection was reused. ``wait`` is time-to-first-byte minus
+    queueing and connection setup: time spent by the server (for agents,
+    mostly model inference).
+    """
+    queued: float = 0.0
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: Optional[float] = None
+    total: Optional[float] = None
+    reused: bool = False
+    _start: float = 0.0
+    _mark: float = 0.0
+
+    @property
+    def wait(self) -> Optional[float]:
+        if self.ttfb is None:
+            return None
+        return max(0.0, self.ttfb - self.queued - self.dns - self.connect)
+
+    def describe(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "n/a" if value is None else f"{value * 1000:.0f}ms"
+        setup = "reused connection" if self.reused else f"dns {ms(self.dns)}, connect+tls {ms(self.connect)}"
+        return f"{setup}, server wait {ms(self.wait)}, ttfb {ms(self.ttfb)}, total {ms(self.total)}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queued_ms": round(self.queued * 1000, 1),
+            "dns_ms": round(self.dns * 1000, 1),
+            "connect_ms": round(self.connect * 1000, 1),
+            "wait_ms": None if self.wait is None else round(self.wait * 1000, 1),
+            "ttfb_ms": None if self.ttfb is None else round(self.ttfb * 1000, 1),
+            "total_ms": None if self.total is None else round(self.total * 1000, 1),
+            "reused": self.reused,
+        }
+
+def _timing(ctx: Any) -> Optional[RequestTiming]:
+    timing = getattr(ctx, "trace_request_ctx", None)
+    return timing if isinstance(timing, RequestTiming) else None
+
+_now = time.perf_counter
+
+async def _on_request_start(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        timing._start = _now()
+
+async def _on_queued_start(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        timing._mark = _now()
+
+async def _on_queued_end(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.queued += _now() - timing._mark
+
+async def _on_dns_start(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        ctx.dns_start = _now()
+
+async def _on_dns_end(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None and hasattr(ctx, "dns_start"):
+        timing.dns += _now() - ctx.dns_start
+
+async def _on_connection_start(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        ctx.connect_start = _now()
+        ctx.dns_before_connect = timing.dns
+
+async def _on_connection_end(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None and hasattr(ctx, "connect_start"):
+        # Connection creation includes host resolution; keep the phases apart
+        dns = timing.dns - ctx.dns_before_connect
+        timing.connect += max(0.0, _now() - ctx.connect_start - dns)
+
+async def _on_connection_reused(session, ctx, params) -> None:
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.reused = True
+
+async def _on_request_end(session, ctx, params) -> None:
+    # Fired once response headers arrive, before the body is read
+    timing = _timing(ctx)
+    if timing is not None and timing.ttfb is None:
+        timing.ttfb = _now() - timing._start
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Trace config filling the RequestTiming passed as ``trace_request_ctx``"""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_connection_queued_start.append(_on_queued_start)
+    trace.on_connection_queued_end.append(_on_queued_end)
+    trace.on_dns_resolvehost_start.append(_on_dns_start)
+    trace.on_dns_resolvehost_end.append(_on_dns_end)
+    trace.on_connection_create_start.append(_on_connection_start)
+    trace.on_connection_create_end.append(_on_connection_end)
+    trace.on_connection_reuseconn.append(_on_connection_reused)
+    trace.on_request_end.append(_on_request_end)
+    return trace
+
+class _ModuleTimings:
+    def __init__(self):
+        self.requests = 0
+        self.reused = 0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.total = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.wait = LatencyHistogram()
+
+class TimingStats:
+    """Per-module request timing summary for one scan"""
+
+    def __init__(self):
+        self.modules: Dict[str, _ModuleTimings] = {}
+
+    def record(self, module: str, timing: RequestTiming) -> None:
+        stats = self.modules.get(module)
+        if stats is None:
+            stats = self.modules[module] = _ModuleTimings()
+        stats.requests += 1
+        stats.reused += timing.reused
+        stats.dns += timing.dns
+        stats.connect += timing.connect
+        if timing.total is not None:
+            stats.total.record(timing.total)
+        if timing.ttfb is not None:
+            stats.ttfb.record(timing.ttfb)
+            stats.wait.record(timing.wait)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        return {
+            module: {
+                "requests": stats.requests,
+                "reused_connections": stats.reused,
+                "dns_avg_ms": ms(stats.dns / stats.requests),
+                "connect_avg_ms": ms(stats.connect / stats.requests),
+                "wait_p50_ms": ms(stats.wait.percentile(50)),
+                "wait_p95_ms": ms(stats.wait.percentile(95)),
+                "ttfb_p50_ms": ms(stats.ttfb.percentile(50)),
+                "ttfb_p95_ms": ms(stats.ttfb.percentile(95)),
+                "total_p50_ms": ms(stats.total.percentile(50)),
+                "total_p95_ms": ms(stats.total.percentile(95)),
+                "total_max_ms": ms(stats.total.max),
+            }
+            for module, stats in sorted(self.modules.items())
+        }
+
+# Set by the scanner for the duration of a scan, and by each tester for its
+# own requests. Tasks inherit both, so a client shared by many scans still
+# attributes every request to the right scan and module.
+current_stats: ContextVar[Optional[TimingStats]] = ContextVar("aiss_timing_stats", default=None)
+current_module: ContextVar[str] = ContextVar("aiss_timing_module", default="unknown")
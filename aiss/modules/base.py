@@ -0,0 +1,174 @@
+"""
+Common base for AISS test modules
+"""
+from contextlib import asynccontextmanager
+from typing import (AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Set, TypeVar)
+import asyncio
+from ..core.config import ScanConfig
+from ..core.detection import StreamInspector
+from ..core.http import HTTPClient, ProbeResponse
+from ..core.leaks import Leak, LeakScorer, current_scorer, detect_leaks
+from ..core.models import Finding, SeverityLevel
+from ..core.secrets import CREDENTIAL_WORDS, FORMATS_BY_NAME, TokenCollector, redact, redact_values
+from ..core.tracing import current_module
+from ..payloads.corpus import Payload, PayloadCorpus, load_corpus
+
+T = TypeVar("T")
+
+_SEVERITY_RANK = {level: rank for rank, level in enumerate(SeverityLevel)}
+
+class BaseTester:
+    """Base class for testers that probe a target over HTTP.
+
+    Testers normally receive the scanner's shared ``HTTPClient``. When used
+    standalone they open a short-lived client of their own.
+
+    With ``on_finding`` set, findings from payload probes are handed over as
+    each probe completes instead of being collected and returned.
+    """
+
+    # Payload pack tag selecting this module's payloads
+    payload_tag: Optional[str] = None
+
+    def __init__(self, target_url: str, client: Optional[HTTPClient] = None,
+                 config: Optional[ScanConfig] = None, corpus: Optional[PayloadCorpus] = None,
+                 on_finding: Optional[Callable[[Finding], None]] = None):
+        self.target = target_url
+        self.client = client
+        self.on_finding = on_finding
+        if config is None:
+            config = client.config if client is not None else ScanConfig()
+        self.config = config
+        self._corpus = corpus
+
+    @property
+    def corpus(self) -> PayloadCorpus:
+        """Payload corpus, opened on first use"""
+        if self._corpus is None:
+            self._corpus = load_corpus(self.config)
+        return self._corpus
+
+    def payloads(self) -> Iterator[Payload]:
+        """Lazily yield this module's payloads, filtered by the scan config"""
+        return self.corpus.select(
+            categories=self.config.payload_categories,
+            tags=self.config.payload_tags,
+            required_tags=[self.payload_tag] if self.payload_tag else None
+        )
+
+    @property
+    def module_name(self) -> str:
+        """Name request timings are summarized under"""
+        return type(self).__module__.rsplit(".", 1)[-1]
+
+    @staticmethod
+    def _proof(proof: str, response: Optional[ProbeResponse]) -> str:
+        """Finding proof with the request timing, marked when the response came from the cache"""
+        if response is not None and response.cached_at:
+            return f"{proof}\n[cached response from {response.cached_at}]"
+        if response is not None and response.timing is not None:
+            return f"{proof}\nTiming: {response.timing.describe()}"
+        return proof
+
+    def _inspector(self, indicators: Iterable[str]) -> StreamInspector:
+        """Inspector for a probe reply that also collects candidate leaked secrets"""
+        return StreamInspector(
+            indicators,
+            excerpt_chars=self.config.proof_excerpt_chars,
+            secrets=TokenCollector(min_length=self.config.secret_min_length)
+        )
+
+    async def _leaks(self, inspector: StreamInspector) -> List[Leak]:
+        """Secrets leaked in an inspected reply, scored with the rest of the scan's replies"""
+        if inspector.secrets is None:
+            return []
+        return await detect_leaks(inspector.secrets.tokens(), self.config)
+
+    @staticmethod
+    def _evidence_severity(severity: SeverityLevel, inspector: StreamInspector,
+                           leaks: List[Leak]) -> SeverityLevel:
+        """Severity of a payload's finding given what its reply showed.
+
+        A leaked secret is at least as severe as its key format. A reply
+        that only names credentials ("token", "password") without
+        containing one is at most MEDIUM.
+        """
+        if leaks:
+            levels = [FORMATS_BY_NAME[leak.kind].severity if leak.kind in FORMATS_BY_NAME
+                      else SeverityLevel.HIGH for leak in leaks]
+            return min([severity] + levels, key=_SEVERITY_RANK.__getitem__)
+        if all(match.indicator in CREDENTIAL_WORDS for match in inspector.matches):
+            return max(severity, SeverityLevel.MEDIUM, key=_SEVERITY_RANK.__getitem__)
+        return severity
+
+    @staticmethod
+    def _reply_proof(inspector: StreamInspector, leaks: List[Leak]) -> str:
+        """The inspector's proof with leaked secrets redacted, followed by a line listing them"""
+        proof = inspector.proof()
+        if not leaks:
+            return proof
+        proof = redact_values(proof, [leak.value for leak in leaks])
+        listed = ", ".join(f"{leak.kind} '{redact(leak.value)}' at {leak.offset}" for leak in leaks[:5])
+        return f"{proof}\nLeaked: {listed}"
+
+    @asynccontextmanager
+    async def _client_scope(self) -> AsyncIterator[HTTPClient]:
+        """Yield the shared client, or a temporary one for standalone use.
+
+        Requests made inside the scope are timed under this module's name.
+        Outside a scan, the module's replies share leak scoring batches.
+        """
+        token = current_module.set(self.module_name)
+        scorer_token = None
+        if current_scorer.get() is None:
+            scorer_token = current_scorer.set(LeakScorer.from_config(self.config))
+        try:
+            if self.client is not None:
+                yield self.client
+            else:
+                async with HTTPClient(self.config) as client:
+                    yield client
+        finally:
+            if scorer_token is not None:
+                current_scorer.reset(scorer_token)
+            current_module.reset(token)
+
+    async def _run_probes(self, items: Iterable[T],
+                          probe: Callable[[T], Awaitable[List[Finding]]]) -> List[Finding]:
+        """Run one probe per item concurrently.
+
+        Items are pulled lazily, keeping at most ``max_requests`` probes
+        pending, so payload generators are never materialized. Findings are
+        returned in item order regardless of completion order, or streamed
+        to ``on_finding`` in completion order, in which case none are kept.
+        """
+        limit = max(1, self.config.max_requests)
+        results: Dict[int, List[Finding]] = {}
+        pending: Set[asyncio.Future] = set()
+
+        async def run(index: int, item: T) -> None:
+            findings = await probe(item)
+            if self.on_finding is None:
+                results[index] = findings
+            else:
+                for finding in findings:
+                    self.on_finding(finding)
+
+        try:
+            for index, item in enumerate(items):
+                if len(pending) >= limit:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.ensure_future(run(index, item)))
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return [finding for index in sorted(results) for finding in results[index]]
+
+    async def run_tests(self) -> List[Finding]:
+        raise NotImplementedError
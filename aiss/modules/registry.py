@@ -0,0 +1,185 @@
+"""
+Registry of test modules
+
+Modules are described by a ``ModuleSpec`` naming the tester class by
+import path, so listing and planning never import a module that will not
+run. Built-in modules are registered here; third-party packages add
+theirs through the ``aiss.modules`` entry point group, pointing either at
+a ``ModuleSpec`` or directly at a ``BaseTester`` subclass:
+
+    [project.entry-points."aiss.modules"]
+    my_check = "my_package.aiss_specs:MY_CHECK"
+"""
+from dataclasses import dataclass
+from importlib import import_module
+from typing import (TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence,
+                    Tuple, Type)
+import asyncio
+import logging
+import aiohttp
+from ..core.models import SeverityLevel
+
+if TYPE_CHECKING:
+    from ..core.http import HTTPClient
+    from .base import BaseTester
+
+ENTRY_POINT_GROUP = "aiss.modules"
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ModuleSpec:
+    """What a test module needs and how expensive it is.
+
+    ``tester`` is a ``"package.module:Class"`` path imported on first use.
+    ``requires`` names prerequisites that must hold for the target, and
+    ``after`` names modules that must finish first. ``cost`` is a rough
+    relative estimate (about one unit per probe round) used to start
+    expensive modules first.
+    """
+    name: str
+    tester: str
+    description: str = ""
+    endpoints: Tuple[str, ...] = ()
+    requires: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    cost: float = 1.0
+
+    def load(self) -> Type['BaseTester']:
+        module, _, attr = self.tester.partition(":")
+        return getattr(import_module(module), attr)
+
+    @classmethod
+    def from_tester(cls, name: str, tester: Type['BaseTester']) -> 'ModuleSpec':
+        """Spec from class attributes of a tester registered directly"""
+        return cls(
+            name=name,
+            tester=f"{tester.__module__}:{tester.__qualname__}",
+            description=(tester.__doc__ or "").strip().split("\n")[0],
+            endpoints=tuple(getattr(tester, "endpoints", ())),
+            requires=tuple(getattr(tester, "requires", ())),
+            after=tuple(getattr(tester, "after", ())),
+            cost=float(getattr(tester, "cost", 1.0)),
+        )
+
+@dataclass(frozen=True)
+class Prerequisite:
+    """A condition checked once per target before the modules needing it.
+
+    ``check`` returns None when the condition holds, or the reason it does
+    not. A failed prerequisite is reported as one finding instead of every
+    dependent module failing probe by probe.
+    """
+    name: str
+    check: Callable[['HTTPClient', str], Awaitable[Optional[str]]]
+    title: str
+    severity: SeverityLevel
+    remediation: str
+
+async def _target_reachable(client: 'HTTPClient', target: str) -> Optional[str]:
+    try:
+        # Any HTTP status means the target answers; cacheable so the
+        # accessibility check of api_test can reuse the response
+        await client.get(target, cacheable=True)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return str(e) or type(e).__name__
+    return None
+
+PREREQUISITES: Dict[str, Prerequisite] = {}
+
+def register_prerequisite(prerequisite: Prerequisite) -> None:
+    PREREQUISITES[prerequisite.name] = prerequisite
+
+register_prerequisite(Prerequisite(
+    name="reachable",
+    check=_target_reachable,
+    title="API Connection Failed",
+    severity=SeverityLevel.HIGH,
+    remediation="Ensure API endpoint is accessible and SSL certificates are valid"
+))
+
+BUILTIN_MODULES = (
+    ModuleSpec("api_test", "aiss.modules.api_test:APISecurityTester",
+               "Accessibility, burst rate limiting and security headers",
+               endpoints=("/",), requires=("reachable",), cost=3.0),
+    ModuleSpec("api_check", "aiss.modules.api_check:APISecurityTester",
+               "Rate-limit threshold ramp and authentication bypass",
+               endpoints=("/api/test", "/api/secured"), requires=("reachable",), cost=4.0),
+    ModuleSpec("agent_test", "aiss.modules.agent_test:AgentResponseTester",
+               "Agent payloads: injection, boundaries, slow replies",
+               endpoints=("/chat",), requires=("reachable",), cost=2.0),
+    ModuleSpec("social_test", "aiss.modules.social_test:SocialTester",
+               "Social engineering payloads",
+               endpoints=("/chat",), requires=("reachable",), cost=2.0),
+)
+
+class ModuleRegistry:
+    """Known test modules, in registration order"""
+
+    def __init__(self, specs: Iterable[ModuleSpec] = (), discover: bool = True):
+        self._specs: Dict[str, ModuleSpec] = {}
+        self._discover = discover
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: ModuleSpec) -> None:
+        self._specs[spec.name] = spec
+
+    def _load_entry_points(self) -> None:
+        if not self._discover:
+            return
+        self._discover = False
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            # Python < 3.10
+            found = entry_points().get(ENTRY_POINT_GROUP, ())
+        for entry_point in found:
+            try:
+                target = entry_point.load()
+            except Exception as e:
+                logger.warning("Could not load AISS module %s: %s", entry_point.name, e)
+                continue
+            spec = target if isinstance(target, ModuleSpec) else ModuleSpec.from_tester(entry_point.name, target)
+            self._specs.setdefault(spec.name, spec)
+
+    def __iter__(self):
+        self._load_entry_points()
+        return iter(list(self._specs.values()))
+
+    def get(self, name: str) -> ModuleSpec:
+        self._load_entry_points()
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise ValueError(f"Unknown module: {name}") from None
+
+    def plan(self, names: Sequence[str] = ()) -> List[ModuleSpec]:
+        """Modules to run, with the modules they come after, in dependency order.
+
+        Raises ValueError on unknown modules or prerequisites and on cycles.
+        """
+        wanted = [self.get(name) for name in names] if names else list(self)
+        ordered: List[ModuleSpec] = []
+        state: Dict[str, str] = {}
+
+        def visit(spec: ModuleSpec, path: Tuple[str, ...]) -> None:
+            if state.get(spec.name) == "done":
+                return
+            if state.get(spec.name) == "visiting":
+                raise ValueError(f"Module dependency cycle: {' -> '.join(path + (spec.name,))}")
+            for requirement in spec.requires:
+                if requirement not in PREREQUISITES:
+                    raise ValueError(f"Module {spec.name} requires unknown prerequisite {requirement}")
+            state[spec.name] = "visiting"
+            for dependency in spec.after:
+                visit(self.get(dependency), path + (spec.name,))
+            state[spec.name] = "done"
+            ordered.append(spec)
+
+        for spec in wanted:
+            visit(spec, ())
+        return ordered
+
+registry = ModuleRegistry(BUILTIN_MODULES)
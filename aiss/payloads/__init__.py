@@ -0,0 +1,3 @@
+"""AISS payload corpus"""
+
+from .corpus import Payload, PayloadCorpus, load_corpus
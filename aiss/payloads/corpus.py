@@ -0,0 +1,239 @@
+"""
+Payload corpus: lazily loaded payload packs with an on-disk index
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import json
+import os
+import sqlite3
+import yaml
+from ..core.config import ScanConfig
+from ..core.models import SeverityLevel
+
+BUILTIN_PACKS = Path(__file__).parent / "packs"
+DEFAULT_INDEX_PATH = "~/.cache/aiss/payload-index.sqlite"
+PACK_SUFFIXES = (".jsonl", ".yaml", ".yml")
+
+@dataclass(frozen=True)
+class Payload:
+    """One attack payload from a pack"""
+    id: str
+    category: str
+    severity: SeverityLevel
+    message: str
+    indicators: Tuple[str, ...]
+    tags: Tuple[str, ...]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Payload':
+        return cls(
+            id=str(data["id"]),
+            category=data["category"],
+            severity=SeverityLevel(data.get("severity", "HIGH")),
+            message=data["message"],
+            indicators=tuple(data.get("indicators", ())),
+            tags=tuple(data.get("tags", ()))
+        )
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS payloads (
+    id INTEGER PRIMARY KEY,
+    pack_id INTEGER NOT NULL REFERENCES packs(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    offset INTEGER,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS payload_tags (
+    payload_id INTEGER NOT NULL REFERENCES payloads(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payloads_category ON payloads(category);
+CREATE INDEX IF NOT EXISTS idx_payloads_pack ON payloads(pack_id, seq);
+CREATE INDEX IF NOT EXISTS idx_payload_tags_tag ON payload_tags(tag, payload_id);
+CREATE INDEX IF NOT EXISTS idx_payload_tags_payload ON payload_tags(payload_id);
+"""
+
+class PayloadCorpus:
+    """Payload packs selected by category and tag through an SQLite index.
+
+    Packs are JSONL or YAML files holding payloads with ``id``,
+    ``category``, ``severity``, ``message``, ``indicators`` and ``tags``.
+    The index records category and tags for every payload, plus the byte
+    offset of JSONL lines, so a selection reads only the payloads it
+    returns. A pack is re-indexed only when its size or mtime changes.
+    YAML packs cannot be read by offset, so their payloads are stored in
+    the index itself.
+    """
+
+    def __init__(self, paths: Sequence[str] = (), index_path: Optional[str] = None,
+                 include_builtin: bool = True):
+        self.paths = [Path(os.path.expanduser(p)) for p in paths]
+        if include_builtin:
+            self.paths.insert(0, BUILTIN_PACKS)
+        self.index_path = os.path.expanduser(index_path or DEFAULT_INDEX_PATH)
+        self._db: Optional[sqlite3.Connection] = None
+        self._pack_ids: Optional[List[int]] = None
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            self._pack_ids = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.index_path != ":memory:":
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            # Fleet workers may index concurrently; wait for their write locks
+            self._db = sqlite3.connect(self.index_path, timeout=30.0)
+            self._db.execute("PRAGMA foreign_keys = ON")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def _pack_files(self) -> Iterator[Path]:
+        for path in self.paths:
+            if path.is_dir():
+                for pack in sorted(path.iterdir()):
+                    if pack.suffix in PACK_SUFFIXES:
+                        yield pack
+            elif path.suffix in PACK_SUFFIXES and path.exists():
+                yield path
+
+    def _ensure_indexed(self) -> List[int]:
+        """Index new or changed packs on first use; returns pack ids in order"""
+        if self._pack_ids is not None:
+            return self._pack_ids
+
+        db = self._connect()
+        pack_ids = []
+        for pack in self._pack_files():
+            stat = pack.stat()
+            path = str(pack.resolve())
+            row = self._indexed_pack(db, path, stat)
+            if row is not None:
+                pack_ids.append(row)
+                continue
+            # Fleet workers sharing a fresh index race to add the same pack:
+            # take the write lock first, then check again under it
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                pack_id = self._indexed_pack(db, path, stat)
+                if pack_id is None:
+                    db.execute("DELETE FROM packs WHERE path = ?", (path,))
+                    cur = db.execute("INSERT INTO packs (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                     (path, stat.st_size, stat.st_mtime_ns))
+                    pack_id = cur.lastrowid
+                    self._index_pack(db, pack_id, pack)
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+            pack_ids.append(pack_id)
+
+        self._pack_ids = pack_ids
+        return pack_ids
+
+    @staticmethod
+    def _indexed_pack(db: sqlite3.Connection, path: str, stat: os.stat_result) -> Optional[int]:
+        """Id of the pack's index entry when it is up to date"""
+        row = db.execute("SELECT id, size, mtime_ns FROM packs WHERE path = ?", (path,)).fetchone()
+        if row and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return row[0]
+        return None
+
+    def _index_pack(self, db: sqlite3.Connection, pack_id: int, pack: Path) -> None:
+        if pack.suffix == ".jsonl":
+            entries = self._scan_jsonl(pack)
+        else:
+            with open(pack) as f:
+                entries = ((None, data) for data in yaml.safe_load(f) or [])
+
+        for seq, (offset, data) in enumerate(entries):
+            stored = json.dumps(data) if offset is None else None
+            cur = db.execute(
+                "INSERT INTO payloads (pack_id, seq, category, offset, data) VALUES (?, ?, ?, ?, ?)",
+                (pack_id, seq, data["category"], offset, stored)
+            )
+            db.executemany("INSERT INTO payload_tags (payload_id, tag) VALUES (?, ?)",
+                           [(cur.lastrowid, tag) for tag in dict.fromkeys(data.get("tags", ()))])
+
+    @staticmethod
+    def _scan_jsonl(pack: Path) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+        with open(pack, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield offset, json.loads(line)
+                offset += len(line)
+
+    def select(self, categories: Optional[Iterable[str]] = None,
+               tags: Optional[Iterable[str]] = None,
+               required_tags: Optional[Iterable[str]] = None) -> Iterator[Payload]:
+        """Yield payloads lazily, in pack order.
+
+        ``categories`` and ``tags`` keep payloads matching any of the given
+        values; ``required_tags`` keeps payloads carrying all of them.
+        """
+        pack_ids = self._ensure_indexed()
+        clauses = ["p.pack_id = ?"]
+        params: List[Any] = []
+        categories = list(categories or ())
+        if categories:
+            clauses.append(f"p.category IN ({','.join('?' * len(categories))})")
+            params.extend(categories)
+        tags = list(tags or ())
+        if tags:
+            clauses.append("p.id IN (SELECT payload_id FROM payload_tags "
+                           f"WHERE tag IN ({','.join('?' * len(tags))}))")
+            params.extend(tags)
+        for tag in dict.fromkeys(required_tags or ()):
+            clauses.append("p.id IN (SELECT payload_id FROM payload_tags WHERE tag = ?)")
+            params.append(tag)
+
+        query = (
+            "SELECT k.path, p.offset, p.data FROM payloads p JOIN packs k ON k.id = p.pack_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY p.seq"
+        )
+        db = self._connect()
+        # One query per pack keeps the configured pack order
+        for pack_id in pack_ids:
+            handle = None
+            try:
+                for path, offset, data in db.execute(query, [pack_id] + params):
+                    if data is None:
+                        if handle is None:
+                            handle = open(path, "rb")
+                        handle.seek(offset)
+                        data = handle.readline()
+                    yield Payload.from_dict(json.loads(data))
+            finally:
+                if handle is not None:
+                    handle.close()
+
+    def categories(self) -> List[str]:
+        """Distinct payload categories in the corpus"""
+        pack_ids = self._ensure_indexed()
+        rows = self._connect().execute(
+            "SELECT DISTINCT category FROM payloads "
+            f"WHERE pack_id IN ({','.join('?' * len(pack_ids))}) ORDER BY category",
+            pack_ids
+        )
+        return [row[0] for row in rows]
+
+_corpora: Dict[Tuple[Tuple[str, ...], Optional[str]], PayloadCorpus] = {}
+
+def load_corpus(config: ScanConfig) -> PayloadCorpus:
+    """Process-wide corpus for the packs and index named in the scan config"""
+    key = (tuple(config.payload_paths), config.payload_index)
+    corpus = _corpora.get(key)
+    if corpus is None:
+        corpus = _corpora[key] = PayloadCorpus(config.payload_paths, config.payload_index)
+    return corpus
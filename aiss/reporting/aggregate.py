@@ -0,0 +1,137 @@
+"""
+Cross-target aggregation of findings
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import re
+from ..core.models import (Finding, SeverityLevel, micros_to_datetime, micros_to_timestamp,
+                           timestamp_to_micros)
+
+_SEVERITY_RANK = {level: rank for rank, level in enumerate(SeverityLevel)}
+# Parts of a title that vary between targets without changing the issue
+_VOLATILE = re.compile(r"https?://\S+|\b[0-9a-f]{8,}\b|\d+(?:\.\d+)?")
+_SPACES = re.compile(r"\s+")
+
+def normalize_title(title: str) -> str:
+    """Title with URLs, ids and numbers masked, case and spacing folded"""
+    return _SPACES.sub(" ", _VOLATILE.sub("#", title.lower())).strip()
+
+def fingerprint(finding: Finding) -> str:
+    """Stable id of the issue a finding reports, shared across targets"""
+    key = f"{finding.module}\x1f{finding.check}\x1f{normalize_title(finding.title)}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+class AggregatedFinding:
+    """All occurrences of one issue across targets.
+
+    Exposes ``severity``, ``title``, ``description``, ``proof`` and
+    ``remediation`` like a ``Finding`` so it renders in the same reports,
+    plus occurrence and affected-target counts, sample proofs and the
+    first and last time the issue was seen.
+    """
+
+    def __init__(self, key: str, finding: Finding, sample_size: int):
+        self.fingerprint = key
+        self.severity = finding.severity
+        self.title = finding.title
+        self.description = finding.description
+        self.remediation = finding.remediation
+        self.module = finding.module
+        self.check = finding.check
+        self.count = 0
+        self.targets: Set[str] = set()
+        self.sample_proofs: List[str] = []
+        self.sample_size = sample_size
+        self.first_seen: Optional[int] = None
+        self.last_seen: Optional[int] = None
+
+    def add(self, finding: Finding) -> None:
+        self.count += 1
+        if _SEVERITY_RANK[finding.severity] < _SEVERITY_RANK[self.severity]:
+            self.severity = finding.severity
+        if finding.target:
+            self.targets.add(finding.target)
+        proof = finding.proof
+        if proof and len(self.sample_proofs) < self.sample_size and proof not in self.sample_proofs:
+            self.sample_proofs.append(proof)
+        micros = timestamp_to_micros(finding.timestamp)
+        if micros is not None:
+            self.first_seen = micros if self.first_seen is None else min(self.first_seen, micros)
+            self.last_seen = micros if self.last_seen is None else max(self.last_seen, micros)
+
+    @property
+    def affected_targets(self) -> int:
+        return len(self.targets)
+
+    @property
+    def proof(self) -> str:
+        return "\n---\n".join(self.sample_proofs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "severity": self.severity.value,
+            "title": self.title,
+            "module": self.module,
+            "check": self.check,
+            "description": self.description,
+            "remediation": self.remediation,
+            "count": self.count,
+            "affected_targets": self.affected_targets,
+            "sample_proofs": self.sample_proofs,
+            "first_seen": micros_to_timestamp(self.first_seen) if self.first_seen is not None else None,
+            "last_seen": micros_to_timestamp(self.last_seen) if self.last_seen is not None else None,
+        }
+
+class FindingAggregator:
+    """Collapses findings into one record per fingerprint.
+
+    Memory and report size grow with the number of distinct issues (plus
+    the affected target names), not with the number of findings.
+    """
+
+    def __init__(self, findings: Iterable[Finding] = (), sample_size: int = 3):
+        self.sample_size = sample_size
+        self.groups: Dict[str, AggregatedFinding] = {}
+        self.total = 0
+        self.extend(findings)
+
+    def add(self, finding: Finding) -> AggregatedFinding:
+        key = fingerprint(finding)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = AggregatedFinding(key, finding, self.sample_size)
+        group.add(finding)
+        self.total += 1
+        return group
+
+    def extend(self, findings: Iterable[Finding]) -> None:
+        for finding in findings:
+            self.add(finding)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self) -> Iterator[AggregatedFinding]:
+        """Groups, most severe first, then most widespread"""
+        return iter(sorted(self.groups.values(), key=lambda g: (
+            _SEVERITY_RANK[g.severity], -g.affected_targets, -g.count, g.title)))
+
+    def summary(self) -> Dict[str, int]:
+        """Distinct issues per severity"""
+        counts = {level.value: 0 for level in SeverityLevel}
+        for group in self.groups.values():
+            counts[group.severity.value] += 1
+        return counts
+
+    def timeline(self) -> Dict[SeverityLevel, Tuple[List[datetime], List[str]]]:
+        """First-seen time and title of each issue, grouped by severity"""
+        series: Dict[SeverityLevel, Tuple[List[datetime], List[str]]] = {}
+        for group in self:
+            if group.first_seen is None:
+                continue
+            times, titles = series.setdefault(group.severity, ([], []))
+            times.append(micros_to_datetime(group.first_seen))
+            titles.append(group.title)
+        return series
@@ -0,0 +1,103 @@
+"""
+Scan-to-scan diff of findings
+"""
+from typing import Any, Collection, Dict, Iterable, List, Tuple
+import sys
+from ..core.models import Finding, SeverityLevel
+from .aggregate import fingerprint
+
+NEW, FIXED, UNCHANGED, UNVERIFIED = "new", "fixed", "unchanged", "unverified"
+STATUSES = (NEW, FIXED, UNCHANGED, UNVERIFIED)
+
+class FindingDiff:
+    """What changed for each target between two scans.
+
+    New and fixed findings are kept for reporting; unchanged findings are
+    only counted. Findings of targets the newer scan failed on are counted
+    as unverified rather than fixed.
+    """
+
+    def __init__(self):
+        self.new: List[Finding] = []
+        self.fixed: List[Finding] = []
+        self.counts: Dict[str, int] = {status: 0 for status in STATUSES}
+        self.targets: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, target: str, status: str, n: int = 1) -> None:
+        self.counts[status] += n
+        counts = self.targets.get(target)
+        if counts is None:
+            counts = self.targets[target] = {status: 0 for status in STATUSES}
+        counts[status] += n
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def severity_summary(self, status: str) -> Dict[str, int]:
+        """New or fixed findings per severity"""
+        counts = {level.value: 0 for level in SeverityLevel}
+        for finding in self.new if status == NEW else self.fixed:
+            counts[finding.severity.value] += 1
+        return counts
+
+    def changed_targets(self) -> List[Tuple[str, Dict[str, int]]]:
+        """Targets with new, fixed or unverified findings, most changes first"""
+        changed = [(target, counts) for target, counts in self.targets.items()
+                   if counts[NEW] or counts[FIXED] or counts[UNVERIFIED]]
+        changed.sort(key=lambda item: (-item[1][NEW] - item[1][FIXED], item[0]))
+        return changed
+
+    def to_dict(self, include_proof: bool = True) -> Dict[str, Any]:
+        def record(finding: Finding) -> Dict[str, Any]:
+            data = finding.to_dict()
+            data["fingerprint"] = fingerprint(finding)
+            if not include_proof:
+                data["proof"] = None
+            return data
+
+        return {
+            "summary": self.summary(),
+            "targets": dict(self.changed_targets()),
+            "new": [record(finding) for finding in self.new],
+            "fixed": [record(finding) for finding in self.fixed],
+        }
+
+def diff_findings(old: Iterable[Finding], new: Iterable[Finding],
+                  failed_targets: Collection[str] = ()) -> FindingDiff:
+    """Compare two streams of findings by target and fingerprint.
+
+    The older stream is indexed by (target, fingerprint) with one entry per
+    distinct issue and an occurrence count, then the newer stream is matched
+    against it one finding at a time, so the diff runs in linear time and
+    holds neither input in full. ``failed_targets`` are targets the newer
+    scan could not reach.
+    """
+    index: Dict[Tuple[str, str], List[Any]] = {}
+    for finding in old:
+        key = (sys.intern(finding.target), fingerprint(finding))
+        entry = index.get(key)
+        if entry is None:
+            index[key] = [1, finding]
+        else:
+            entry[0] += 1
+
+    result = FindingDiff()
+    for finding in new:
+        key = (sys.intern(finding.target), fingerprint(finding))
+        entry = index.get(key)
+        if entry is None:
+            result.new.append(finding)
+            result._count(finding.target, NEW)
+            continue
+        entry[0] -= 1
+        if entry[0] == 0:
+            del index[key]
+        result._count(finding.target, UNCHANGED)
+
+    for (target, _), (count, finding) in index.items():
+        if target in failed_targets:
+            result._count(target, UNVERIFIED, count)
+            continue
+        result.fixed.extend([finding] * count)
+        result._count(target, FIXED, count)
+    return result
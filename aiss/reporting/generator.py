@@ -1,40 +1,140 @@
 """
 Enhanced reporting system for AISS
+
+HTML reports load the plotly runtime once in the browser and draw charts
+from precomputed data, so plotly is imported only to inline its runtime.
+jinja2 and rich are imported only by the formats that use them, so text
+and JSON reports never pay for the charting stack.
 """
-from typing import List, Dict, Any
-from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable, Dict, Any, List, Optional, Union
+import base64
+import gzip
 import json
+import os
 from pathlib import Path
-import jinja2
-from rich.console import Console
-from rich.table import Table
-from ..core.scanner import Finding, SeverityLevel
+from ..core.models import Finding, SeverityLevel
 from ..core.config import ReportConfig
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+from .aggregate import FindingAggregator
+from .diff import FIXED, NEW, FindingDiff
+from .store import SEVERITIES, FindingStore, StringTable
+
+if TYPE_CHECKING:
+    import jinja2
+    from rich.console import Console
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+# Timelines with more points than this are drawn as per-bucket counts
+TIMELINE_MAX_POINTS = 2000
+TIMELINE_BUCKETS = 200
+# Changed targets listed in the summary of an HTML diff report
+DIFF_MAX_TARGETS = 500
+
+_template_envs: Dict[Optional[str], 'jinja2.Environment'] = {}
+
+def template_environment(cache_dir: Optional[str] = None) -> 'jinja2.Environment':
+    """Process-wide template environment.
+
+    Templates are compiled once per process, and with ``cache_dir`` the
+    compiled bytecode is also kept on disk for later runs.
+    """
+    env = _template_envs.get(cache_dir)
+    if env is None:
+        import jinja2
+        bytecode_cache = None
+        if cache_dir:
+            directory = os.path.expanduser(cache_dir)
+            os.makedirs(directory, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(directory)
+        env = _template_envs[cache_dir] = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(searchpath=str(TEMPLATE_DIR)),
+            bytecode_cache=bytecode_cache,
+            autoescape=jinja2.select_autoescape(["html"])
+        )
+    return env
 
 class ReportGenerator:
     def __init__(self, config: ReportConfig):
         self.config = config
-        self.console = Console()
-        self.template_loader = jinja2.FileSystemLoader(
-            searchpath=str(Path(__file__).parent / "templates")
-        )
-        self.template_env = jinja2.Environment(loader=self.template_loader)
+        self._console = None
+
+    @property
+    def console(self) -> 'Console':
+        if self._console is None:
+            from rich.console import Console
+            # Recorded so the text report can be returned as well as printed
+            self._console = Console(record=True)
+        return self._console
+
+    @property
+    def template_env(self) -> 'jinja2.Environment':
+        return template_environment(self.config.template_cache_dir)
         
-    def generate(self, findings: List[Finding], scan_metadata: Dict[str, Any]) -> str:
-        """Generate report based on configured format"""
+    def generate(self, findings: Union[FindingStore, FindingAggregator, Iterable[Finding]],
+                 scan_metadata: Dict[str, Any]) -> str:
+        """Generate report based on configured format.
+
+        Findings may be passed as a ``FindingStore`` or any iterable, which
+        is loaded into one so every format works from its columns. A
+        ``FindingAggregator``, or ``aggregate`` in the report config, gives
+        a report with one entry per distinct issue instead.
+        """
+        if isinstance(findings, FindingAggregator) or self.config.aggregate:
+            if not isinstance(findings, FindingAggregator):
+                findings = FindingAggregator(findings)
+            return self._generate_aggregated(findings, scan_metadata)
+        if not isinstance(findings, FindingStore):
+            findings = FindingStore(findings)
         if self.config.output_format == "json":
             return self._generate_json(findings, scan_metadata)
         elif self.config.output_format == "html":
             return self._generate_html(findings, scan_metadata)
+        elif self.config.output_format == "ndjson":
+            return self._generate_ndjson(findings, scan_metadata)
         else:
             return self._generate_text(findings, scan_metadata)
             
-    def _generate_text(self, findings: List[Finding], metadata: Dict[str, Any]) -> str:
+    def generate_diff(self, diff: FindingDiff, metadata: Dict[str, Any]) -> str:
+        """Report what changed between two scans in the configured format"""
+        if self.config.output_format == "json":
+            return json.dumps({"metadata": metadata,
+                               **diff.to_dict(self.config.include_proof)}, indent=2)
+        if self.config.output_format == "ndjson":
+            data = diff.to_dict(self.config.include_proof)
+            lines = [{"type": status, **record} for status in (NEW, FIXED) for record in data[status]]
+            lines.append({"type": "summary", **data["summary"], "targets": data["targets"]})
+            return "".join(json.dumps(line) + "\n" for line in lines)
+        if self.config.output_format == "html":
+            return self._generate_html(FindingStore(diff.new + diff.fixed), metadata, diff)
+
+        from rich.table import Table
+        self.console.print(f"Comparing {metadata.get('old')} -> {metadata.get('new')}")
+        summary = diff.summary()
+        self.console.print(", ".join(f"{count} {status}" for status, count in summary.items()) + "\n")
+
+        targets = Table(title="Changed Targets")
+        for column in ("Target", "New", "Fixed", "Unchanged", "Unverified"):
+            targets.add_column(column)
+        for target, counts in diff.changed_targets():
+            targets.add_row(target, *(str(count) for count in counts.values()))
+        self.console.print(targets)
+
+        for status, findings in ((NEW, diff.new), (FIXED, diff.fixed)):
+            if not findings:
+                continue
+            table = Table(title=f"{status.capitalize()} Findings")
+            for column in ("Severity", "Target", "Title", "Remediation"):
+                table.add_column(column)
+            for finding in findings:
+                table.add_row(finding.severity.value, finding.target, finding.title,
+                              finding.remediation, style=self._get_severity_style(finding.severity))
+            self.console.print(table)
+        return self.console.export_text()
+
+    def _generate_text(self, findings: FindingStore, metadata: Dict[str, Any]) -> str:
         """Generate text report"""
-        table = Table(title="AISS Security Assessment Report")
+        from rich.table import Table
         
         # Add metadata
         self.console.print(f"Scan completed at: {metadata['timestamp']}")
@@ -46,7 +146,7 @@ class ReportGenerator:
         summary_table.add_column("Count")
         
         for severity in SeverityLevel:
-            count = len([f for f in findings if f.severity == severity])
+            count = findings.count(severity)
             if count > 0:
                 summary_table.add_row(
                     severity.value,
@@ -81,87 +181,221 @@ class ReportGenerator:
         self.console.print(findings_table)
         return self.console.export_text()
         
-    def _generate_json(self, findings: List[Finding], metadata: Dict[str, Any]) -> str:
+    def _generate_json(self, findings: FindingStore, metadata: Dict[str, Any]) -> str:
         """Generate JSON report"""
         report = {
             "metadata": metadata,
-            "summary": self._generate_summary(findings),
+            "summary": findings.summary(),
             "findings": [self._finding_to_dict(f) for f in findings]
         }
         return json.dumps(report, indent=2)
         
-    def _generate_html(self, findings: List[Finding], metadata: Dict[str, Any]) -> str:
-        """Generate HTML report with visualizations"""
-        template = self.template_env.get_template("report.html")
+    def _generate_ndjson(self, findings: FindingStore, metadata: Dict[str, Any]) -> str:
+        """Generate NDJSON report: scan header, one line per finding, summary trailer"""
+        from io import StringIO
+        from .stream import NDJSONWriter
+
+        buffer = StringIO()
+        writer = NDJSONWriter(buffer, include_proof=self.config.include_proof)
+        header = {key: value for key, value in metadata.items() if key != "summary"}
+        writer.header(**header)
+        for finding in findings:
+            writer.finding(finding)
+        writer.trailer()
+        return buffer.getvalue()
         
-        # Generate charts
-        severity_chart = self._create_severity_chart(findings)
-        timeline_chart = self._create_timeline_chart(findings)
+    def _generate_aggregated(self, issues: FindingAggregator, metadata: Dict[str, Any]) -> str:
+        """Generate a report with one entry per distinct issue"""
+        if self.config.output_format == "html":
+            return self._generate_html(issues, metadata)
+
+        records = []
+        for issue in issues:
+            record = issue.to_dict()
+            if not self.config.include_proof:
+                record["sample_proofs"] = []
+            records.append(record)
+
+        if self.config.output_format == "json":
+            return json.dumps({
+                "metadata": metadata,
+                "summary": issues.summary(),
+                "findings_total": issues.total,
+                "issues": records
+            }, indent=2)
+        if self.config.output_format == "ndjson":
+            lines = [{"type": "issue", **record} for record in records]
+            lines.append({"type": "summary", "issues": len(records), "findings": issues.total,
+                          "summary": issues.summary()})
+            return "".join(json.dumps(line) + "\n" for line in lines)
+
+        from rich.table import Table
+        table = Table(title=f"{len(records)} distinct issues from {issues.total} findings")
+        for column in ("Severity", "Title", "Findings", "Targets", "Remediation"):
+            table.add_column(column)
+        for issue in issues:
+            table.add_row(issue.severity.value, issue.title, str(issue.count),
+                          str(issue.affected_targets), issue.remediation,
+                          style=self._get_severity_style(issue.severity))
+        self.console.print(table)
+        return self.console.export_text()
+        
+    def _generate_html(self, findings: Union[FindingStore, FindingAggregator],
+                       metadata: Dict[str, Any], diff: Optional[FindingDiff] = None) -> str:
+        """Generate HTML report with visualizations.
+
+        Charts are passed as plotly JSON specs drawn by one shared runtime,
+        and findings as a compressed blob the page decodes and shows one
+        page at a time, so report size and load time stay manageable with
+        hundreds of thousands of findings. A ``diff`` report lists its new
+        findings followed by its fixed ones, each tagged with its change.
+        """
+        template = self.template_env.get_template("report.html")
+        plotly_src, plotly_inline = self._plotly_runtime()
         
         context = {
             "metadata": metadata,
-            "findings": findings,
-            "summary": self._generate_summary(findings),
-            "severity_chart": severity_chart.to_html(full_html=False),
-            "timeline_chart": timeline_chart.to_html(full_html=False),
+            "total": findings.total if isinstance(findings, FindingAggregator) else len(findings),
+            "summary": findings.summary(),
+            "charts": {
+                "severity": (self._create_diff_chart(diff) if diff is not None
+                             else self._create_severity_chart(findings)),
+                "timeline": self._create_timeline_chart(findings),
+            },
+            "findings_blob": self._findings_blob(findings, diff),
+            "diff": diff,
+            "max_targets": DIFF_MAX_TARGETS,
+            "page_size": self.config.html_page_size,
+            "plotly_src": plotly_src,
+            "plotly_inline": plotly_inline,
             "company_name": self.config.company_name,
             "logo_path": self.config.logo_path
         }
         
         return template.render(**context)
+
+    def _plotly_runtime(self) -> tuple:
+        """Script URL or inline source of the plotly runtime, included once"""
+        source = self.config.plotly_js
+        if source == "inline":
+            from plotly.offline import get_plotlyjs
+            return None, get_plotlyjs()
+        if source == "cdn":
+            return PLOTLY_CDN, None
+        # Path or URL of a local copy
+        return source, None
+
+    def _findings_blob(self, findings: Union[FindingStore, FindingAggregator],
+                       diff: Optional[FindingDiff] = None) -> str:
+        """Findings as base64 gzip JSON: a string table plus compact rows"""
+        strings = StringTable()
+        include_proof = self.config.include_proof
+        rows: List[list] = []
+        if isinstance(findings, FindingStore):
+            text = findings.strings
+            for row in range(len(findings)):
+                proof = findings.proofs[row]
+                rows.append([
+                    findings.severity[row],
+                    strings.intern(text[findings.title[row]]),
+                    strings.intern(text[findings.description[row]]),
+                    strings.intern(text[findings.remediation[row]]),
+                    strings.intern(proof.text) if include_proof and proof is not None else 0,
+                    findings.timestamp_text(row)
+                ])
+        else:
+            codes = {level: code for code, level in enumerate(SEVERITIES)}
+            for issue in findings:
+                record = issue.to_dict()
+                rows.append([
+                    codes[issue.severity],
+                    strings.intern(issue.title),
+                    strings.intern(issue.description),
+                    strings.intern(issue.remediation),
+                    strings.intern(issue.proof) if include_proof else 0,
+                    record["last_seen"] or "",
+                    issue.count,
+                    issue.affected_targets
+                ])
+
+        data: Dict[str, Any] = {"strings": strings.strings, "rows": rows}
+        if diff is not None:
+            # Parallel to rows: the change each finding represents
+            data["changes"] = [NEW, FIXED]
+            data["change"] = [0] * len(diff.new) + [1] * len(diff.fixed)
+            data["targets"] = [strings.intern(f.target) for f in diff.new + diff.fixed]
+        payload = json.dumps(data, separators=(",", ":"))
+        return base64.b64encode(gzip.compress(payload.encode(), mtime=0)).decode("ascii")
         
-    def _create_severity_chart(self, findings: List[Finding]) -> go.Figure:
-        """Create severity distribution chart"""
-        severity_counts = {}
-        for severity in SeverityLevel:
-            count = len([f for f in findings if f.severity == severity])
-            severity_counts[severity.value] = count
-            
-        fig = px.pie(
-            values=list(severity_counts.values()),
-            names=list(severity_counts.keys()),
-            title="Findings by Severity"
-        )
-        return fig
-        
-    def _create_timeline_chart(self, findings: List[Finding]) -> go.Figure:
-        """Create findings timeline chart"""
-        df = pd.DataFrame([
-            {
-                "timestamp": datetime.fromisoformat(f.timestamp),
-                "severity": f.severity.value,
-                "title": f.title
-            }
-            for f in findings
-        ])
-        
-        fig = px.timeline(
-            df,
-            x_start="timestamp",
-            y="severity",
-            color="severity",
-            hover_data=["title"],
-            title="Findings Timeline"
-        )
-        return fig
-        
-    def _finding_to_dict(self, finding: Finding) -> Dict[str, Any]:
-        """Convert finding to dictionary"""
+    def _create_severity_chart(self, findings: Union[FindingStore, FindingAggregator]) -> Dict[str, Any]:
+        """Severity distribution as a plotly pie spec"""
+        severity_counts = findings.summary()
         return {
-            "severity": finding.severity.value,
-            "title": finding.title,
-            "description": finding.description,
-            "proof": finding.proof if self.config.include_proof else None,
-            "remediation": finding.remediation,
-            "timestamp": finding.timestamp
+            "data": [{
+                "type": "pie",
+                "values": list(severity_counts.values()),
+                "labels": list(severity_counts.keys()),
+                "sort": False
+            }],
+            "layout": {"title": {"text": "Findings by Severity"}}
         }
         
-    def _generate_summary(self, findings: List[Finding]) -> Dict[str, int]:
-        """Generate severity summary"""
-        return {
-            severity.value: len([f for f in findings if f.severity == severity])
-            for severity in SeverityLevel
-        }
+    def _create_diff_chart(self, diff: FindingDiff) -> Dict[str, Any]:
+        """New and fixed findings per severity as a grouped bar spec"""
+        traces = []
+        for status in (NEW, FIXED):
+            counts = diff.severity_summary(status)
+            traces.append({"type": "bar", "name": status.capitalize(),
+                           "x": list(counts.keys()), "y": list(counts.values())})
+        return {"data": traces, "layout": {"title": {"text": "Changes by Severity"}, "barmode": "group"}}
+
+    def _create_timeline_chart(self, findings: Union[FindingStore, FindingAggregator]) -> Dict[str, Any]:
+        """Findings timeline as a plotly spec, one trace per severity.
+
+        Small reports get one marker per finding; larger ones are bucketed
+        into counts so the chart data stays bounded.
+        """
+        series = findings.timeline()
+        points = sum(len(times) for times, _ in series.values())
+        traces = []
+        if points <= TIMELINE_MAX_POINTS:
+            for severity, (times, titles) in series.items():
+                traces.append({
+                    "type": "scatter",
+                    "mode": "markers",
+                    "name": severity.value,
+                    "x": [t.isoformat() for t in times],
+                    "y": [severity.value] * len(times),
+                    "text": titles,
+                    "hovertemplate": "%{x}<br>%{text}<extra></extra>"
+                })
+            layout = {"title": {"text": "Findings Timeline"}}
+        else:
+            start = min(min(times) for times, _ in series.values())
+            end = max(max(times) for times, _ in series.values())
+            width = max((end - start).total_seconds() / TIMELINE_BUCKETS, 1e-6)
+            edges = [(start + timedelta(seconds=i * width)).isoformat() for i in range(TIMELINE_BUCKETS)]
+            for severity, (times, _) in series.items():
+                counts = [0] * TIMELINE_BUCKETS
+                for t in times:
+                    index = int((t - start).total_seconds() / width)
+                    counts[min(index, TIMELINE_BUCKETS - 1)] += 1
+                traces.append({
+                    "type": "bar",
+                    "name": severity.value,
+                    "x": edges,
+                    "y": counts
+                })
+            layout = {"title": {"text": "Findings Timeline"}, "barmode": "stack"}
+        return {"data": traces, "layout": layout}
+        
+    def _finding_to_dict(self, finding: Finding) -> Dict[str, Any]:
+        """Convert finding to dictionary, with the module, check and target
+        that diffs and aggregation fingerprint it by"""
+        data = finding.to_dict()
+        if not self.config.include_proof:
+            data["proof"] = None
+        return data
         
     def _get_severity_style(self, severity: SeverityLevel) -> str:
         """Get rich console style for severity"""
@@ -0,0 +1,206 @@
+"""
+Local history of scan results for trend queries
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import os
+import sqlite3
+import time
+from ..core.models import Finding, SeverityLevel, timestamp_to_micros
+from .aggregate import fingerprint
+
+SEVERITIES: Tuple[SeverityLevel, ...] = tuple(SeverityLevel)
+_SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITIES)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    label TEXT,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_targets (
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    scanned REAL NOT NULL,
+    error TEXT,
+    PRIMARY KEY (scan_id, target_id)
+);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    severity INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    module TEXT,
+    check_name TEXT,
+    title TEXT NOT NULL,
+    seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scans_started ON scans(started);
+CREATE INDEX IF NOT EXISTS idx_scan_targets_target ON scan_targets(target_id, scanned);
+CREATE INDEX IF NOT EXISTS idx_findings_target ON findings(target_id, severity, seen);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity, seen, target_id);
+CREATE INDEX IF NOT EXISTS idx_findings_fingerprint ON findings(fingerprint, seen);
+CREATE INDEX IF NOT EXISTS idx_findings_seen ON findings(seen);
+"""
+
+# SQL expression each trend query groups findings by
+GROUPS = {
+    "target": "t.url",
+    "day": "date(f.seen, 'unixepoch')",
+    "fingerprint": "f.fingerprint",
+    "severity": "f.severity",
+}
+
+class HistoryStore:
+    """SQLite (WAL) store of past scans, their targets and findings.
+
+    Findings are buffered and written ``batch_size`` rows per transaction.
+    Indexes on target, severity, fingerprint and time keep trend queries
+    over years of nightly fleet scans to index range scans.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = os.path.expanduser(path)
+        self.batch_size = batch_size
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[Any, ...]] = []
+        self._target_ids: Dict[str, int] = {}
+
+    def __enter__(self) -> 'HistoryStore':
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Fleet scans with worker processes record from an executor thread
+        self._db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+            self._target_ids.clear()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.open()
+        return self._db
+
+    def begin_scan(self, kind: str = "scan", label: Optional[str] = None) -> int:
+        """Start recording a scan; returns its id"""
+        cur = self.db.execute("INSERT INTO scans (kind, label, started) VALUES (?, ?, ?)",
+                              (kind, label, time.time()))
+        return cur.lastrowid
+
+    def finish_scan(self, scan_id: int) -> None:
+        self.flush()
+        self.db.execute("UPDATE scans SET finished = ? WHERE id = ?", (time.time(), scan_id))
+
+    def _target_id(self, url: str) -> int:
+        target_id = self._target_ids.get(url)
+        if target_id is None:
+            self.db.execute("INSERT OR IGNORE INTO targets (url) VALUES (?)", (url,))
+            target_id = self.db.execute("SELECT id FROM targets WHERE url = ?", (url,)).fetchone()[0]
+            self._target_ids[url] = target_id
+        return target_id
+
+    def record_target(self, scan_id: int, target: str, error: Optional[str] = None) -> None:
+        """Record that ``target`` was scanned, so targets without findings show in trends"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO scan_targets (scan_id, target_id, scanned, error) "
+            "VALUES (?, ?, ?, ?)",
+            (scan_id, self._target_id(target), time.time(), error)
+        )
+
+    def add_finding(self, scan_id: int, finding: Finding, target: Optional[str] = None) -> None:
+        """Buffer a finding; written with the next full batch or ``flush``"""
+        micros = timestamp_to_micros(finding.timestamp)
+        seen = micros / 1e6 if micros is not None else time.time()
+        self._pending.append((
+            scan_id, self._target_id(target or finding.target), _SEVERITY_CODES[finding.severity],
+            fingerprint(finding), finding.module, finding.check, finding.title, seen
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending or self._db is None:
+            return
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO findings (scan_id, target_id, severity, fingerprint, module, "
+                "check_name, title, seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+        self._pending = []
+
+    def add_target(self, scan_id: int, target: str, findings: Iterable[Finding],
+                   error: Optional[str] = None) -> None:
+        """Record a scanned target together with its findings"""
+        self.record_target(scan_id, target, error)
+        for finding in findings:
+            self.add_finding(scan_id, finding, target)
+
+    def record_results(self, results: Dict[str, Any], label: Optional[str] = None) -> int:
+        """Store the results of one ``SecurityScanner.run_scan`` call"""
+        scan_id = self.begin_scan("scan", label)
+        self.add_target(scan_id, results["target"], results["findings"])
+        self.finish_scan(scan_id)
+        return scan_id
+
+    def counts(self, days: float = 30, severities: Sequence[SeverityLevel] = (),
+               target: Optional[str] = None, group_by: str = "target",
+               limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Finding counts over the last ``days``, grouped by target, day,
+        fingerprint or severity, largest first (by time for days)"""
+        expression = GROUPS[group_by]
+        clauses = ["f.seen >= ?"]
+        params: List[Any] = [time.time() - days * 86400]
+        if severities:
+            clauses.append(f"f.severity IN ({','.join('?' * len(severities))})")
+            params.extend(_SEVERITY_CODES[level] for level in severities)
+        if target is not None:
+            clauses.append("f.target_id = (SELECT id FROM targets WHERE url = ?)")
+            params.append(target)
+        order = "bucket" if group_by == "day" else "n DESC, bucket"
+        query = (
+            f"SELECT {expression} AS bucket, COUNT(*) AS n FROM findings f "
+            f"JOIN targets t ON t.id = f.target_id WHERE {' AND '.join(clauses)} "
+            f"GROUP BY bucket ORDER BY {order}"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        self.flush()
+        rows = self.db.execute(query, params).fetchall()
+        if group_by == "severity":
+            return [(SEVERITIES[code].value, n) for code, n in rows]
+        return rows
+
+    def scans(self, limit: int = 20) -> List[Tuple[int, str, Optional[str], float, Optional[float], int, int]]:
+        """Most recent scans with their target and finding counts"""
+        return self.db.execute(
+            "SELECT s.id, s.kind, s.label, s.started, s.finished, "
+            "(SELECT COUNT(*) FROM scan_targets WHERE scan_id = s.id), "
+            "(SELECT COUNT(*) FROM findings WHERE scan_id = s.id) "
+            "FROM scans s ORDER BY s.started DESC LIMIT ?", (limit,)
+        ).fetchall()
@@ -0,0 +1,173 @@
+"""
+Columnar finding storage for reporting
+"""
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..core.models import (Finding, Proof, SeverityLevel, micros_to_datetime,
+                           micros_to_timestamp, timestamp_to_micros)
+
+SEVERITIES: Tuple[SeverityLevel, ...] = tuple(SeverityLevel)
+_SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITIES)}
+# Timestamp column value for findings without a parseable timestamp
+NO_TIMESTAMP = -(2 ** 63)
+class StringTable:
+    """Interned strings addressed by integer id; id 0 is the empty string"""
+
+    def __init__(self):
+        self.strings: List[str] = [""]
+        self.ids: Dict[str, int] = {"": 0}
+
+    def intern(self, value: Optional[str]) -> int:
+        if not value:
+            return 0
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def __getitem__(self, sid: int) -> str:
+        return self.strings[sid]
+
+class FindingStore:
+    """Findings kept in array-backed columns.
+
+    Severities are stored as codes and titles, descriptions, remediations,
+    modules, checks and targets as ids into one string table, so repeated
+    text is held once.
+    Timestamps are integer microseconds. Per-severity and per-title counts
+    are maintained on insert, and row indexes by severity, title and target
+    let summaries, charts and filters avoid scanning every finding.
+    """
+
+    def __init__(self, findings: Iterable[Finding] = (), target: Optional[str] = None):
+        self.strings = StringTable()
+        self.severity = array("B")
+        self.title = array("I")
+        self.description = array("I")
+        self.remediation = array("I")
+        self.module = array("I")
+        self.check = array("I")
+        self.target = array("I")
+        self.timestamp = array("q")
+        # Shared, deduplicated proof objects (None for an empty proof)
+        self.proofs: List[Optional[Proof]] = []
+        # Timestamps that do not round-trip through the integer column
+        self._raw_timestamps: Dict[int, str] = {}
+        self.severity_counts: List[int] = [0] * len(SEVERITIES)
+        self.title_counts: Dict[int, int] = {}
+        self.by_severity: Dict[int, array] = {}
+        self.by_title: Dict[int, array] = {}
+        self.by_target: Dict[int, array] = {}
+        self.extend(findings, target)
+
+    def __len__(self) -> int:
+        return len(self.severity)
+
+    def add(self, finding: Finding, target: Optional[str] = None) -> int:
+        """Append a finding, under ``target`` if given, else its own; returns its row number"""
+        row = len(self.severity)
+        severity = _SEVERITY_CODES[finding.severity]
+        title = self.strings.intern(finding.title)
+        target_id = self.strings.intern(target or finding.target)
+
+        self.severity.append(severity)
+        self.title.append(title)
+        self.description.append(self.strings.intern(finding.description))
+        self.remediation.append(self.strings.intern(finding.remediation))
+        self.module.append(self.strings.intern(finding.module))
+        self.check.append(self.strings.intern(finding.check))
+        self.target.append(target_id)
+        self.proofs.append(finding.proof_ref)
+        micros = timestamp_to_micros(finding.timestamp)
+        if micros is None:
+            micros = NO_TIMESTAMP
+            if finding.timestamp:
+                self._raw_timestamps[row] = finding.timestamp
+        self.timestamp.append(micros)
+
+        self.severity_counts[severity] += 1
+        self.title_counts[title] = self.title_counts.get(title, 0) + 1
+        for index, key in ((self.by_severity, severity), (self.by_title, title),
+                           (self.by_target, target_id)):
+            rows = index.get(key)
+            if rows is None:
+                rows = index[key] = array("I")
+            rows.append(row)
+        return row
+
+    def extend(self, findings: Iterable[Finding], target: Optional[str] = None) -> None:
+        for finding in findings:
+            self.add(finding, target)
+
+    def timestamp_text(self, row: int) -> str:
+        micros = self.timestamp[row]
+        if micros == NO_TIMESTAMP:
+            return self._raw_timestamps.get(row, "")
+        return micros_to_timestamp(micros)
+
+    def __getitem__(self, row: int) -> Finding:
+        return Finding(
+            severity=SEVERITIES[self.severity[row]],
+            title=self.strings[self.title[row]],
+            description=self.strings[self.description[row]],
+            proof=self.proofs[row].text if self.proofs[row] is not None else "",
+            remediation=self.strings[self.remediation[row]],
+            timestamp=self.timestamp_text(row),
+            module=self.strings[self.module[row]],
+            check=self.strings[self.check[row]],
+            target=self.strings[self.target[row]]
+        )
+
+    def __iter__(self) -> Iterator[Finding]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def rows(self, severity: Optional[SeverityLevel] = None, title: Optional[str] = None,
+             target: Optional[str] = None) -> Sequence[int]:
+        """Row numbers matching every given filter, in insertion order"""
+        candidates = []
+        if severity is not None:
+            candidates.append(self.by_severity.get(_SEVERITY_CODES[severity], ()))
+        if title is not None:
+            candidates.append(self.by_title.get(self.strings.ids.get(title, -1), ()))
+        if target is not None:
+            candidates.append(self.by_target.get(self.strings.ids.get(target, -1), ()))
+        if not candidates:
+            return range(len(self))
+        # Walk the smallest index and probe the others
+        candidates.sort(key=len)
+        smallest, others = candidates[0], [set(rows) for rows in candidates[1:]]
+        return [row for row in smallest if all(row in rows for rows in others)]
+
+    def filter(self, severity: Optional[SeverityLevel] = None, title: Optional[str] = None,
+               target: Optional[str] = None) -> Iterator[Finding]:
+        for row in self.rows(severity, title, target):
+            yield self[row]
+
+    def count(self, severity: SeverityLevel) -> int:
+        return self.severity_counts[_SEVERITY_CODES[severity]]
+
+    def summary(self) -> Dict[str, int]:
+        """Finding count per severity, most severe first"""
+        return {level.value: count for level, count in zip(SEVERITIES, self.severity_counts)}
+
+    def title_summary(self) -> Dict[str, int]:
+        """Finding count per title, most frequent first"""
+        counts = sorted(self.title_counts.items(), key=lambda item: -item[1])
+        return {self.strings[title]: count for title, count in counts}
+
+    def timeline(self) -> Dict[SeverityLevel, Tuple[List[datetime], List[str]]]:
+        """Timestamps and titles of timestamped findings, grouped by severity"""
+        series = {}
+        for code, rows in sorted(self.by_severity.items()):
+            times, titles = [], []
+            for row in rows:
+                micros = self.timestamp[row]
+                if micros != NO_TIMESTAMP:
+                    times.append(micros_to_datetime(micros))
+                    titles.append(self.strings[self.title[row]])
+            if times:
+                series[SEVERITIES[code]] = (times, titles)
+        return series
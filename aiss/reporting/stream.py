@@ -0,0 +1,176 @@
+"""
+Streaming NDJSON findings output
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+import json
+from ..core.models import Finding, SeverityLevel
+
+class NDJSONWriter:
+    """Write scan output as one JSON object per line, as it is produced.
+
+    A ``scan`` header line is followed by one ``finding`` line per finding
+    and a ``summary`` trailer with counts kept incrementally, so memory
+    stays flat however many findings a scan yields. Every line is flushed
+    so consumers can tail the output live.
+    """
+
+    def __init__(self, output: TextIO, include_proof: bool = True):
+        self.output = output
+        self.include_proof = include_proof
+        self.counts: Dict[str, int] = {level.value: 0 for level in SeverityLevel}
+        self.total = 0
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.output.write(json.dumps(record) + "\n")
+        self.output.flush()
+
+    def header(self, **fields: Any) -> None:
+        self._write({"type": "scan", **fields})
+
+    def finding(self, finding: Finding) -> None:
+        record = finding.to_dict()
+        if not self.include_proof:
+            record["proof"] = None
+        self.counts[finding.severity.value] += 1
+        self.total += 1
+        self._write({"type": "finding", **record})
+
+    def trailer(self, **fields: Any) -> None:
+        self._write({"type": "summary", "findings": self.total, "summary": self.counts, **fields})
+
+# Characters read from a JSON report at a time
+_CHUNK_CHARS = 1 << 16
+
+class _JSONReader:
+    """Incremental reader of one JSON document.
+
+    Only the unread tail of the document is buffered, so a ``findings``
+    array can be walked one element at a time however long it is.
+    """
+
+    def __init__(self, source: TextIO, text: str = ""):
+        self.source = source
+        self.buffer = text
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.source.read(_CHUNK_CHARS)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the document"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON report: expected {char!r} near offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                pass
+            if not self._fill():
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+
+    def items(self) -> Iterator[Any]:
+        """Elements of the array starting here, one at a time"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def members(self) -> Iterator[str]:
+        """Keys of the object starting here; the caller reads each value"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            self.expect(",")
+
+def read_findings(source: TextIO, errors: Optional[Dict[str, str]] = None) -> Iterator[Finding]:
+    """Stream findings back from AISS output.
+
+    Accepts NDJSON from ``NDJSONWriter`` or fleet scans (one object per
+    target with a ``findings`` list), and JSON reports. NDJSON is read a
+    line at a time. A pretty-printed JSON report is read incrementally,
+    its ``findings`` array one element at a time; the report's target is
+    taken from ``metadata`` written before the array, as ``aiss scan``
+    does. Targets a fleet scan failed on are added to ``errors`` if given.
+    """
+    first = source.readline()
+    if first.strip() == "{":
+        yield from _report_findings(_JSONReader(source, first))
+        return
+    if first.strip() == "[":
+        records: Iterable[Dict[str, Any]] = _JSONReader(source, first).items()
+    else:
+        records = (json.loads(line) for line in _lines(first, source) if line.strip())
+
+    scan_target = ""
+    for record in records:
+        kind = record.get("type")
+        if kind == "scan":
+            scan_target = record.get("target") or ""
+        elif kind == "finding":
+            finding = Finding.from_dict(record)
+            finding.target = finding.target or scan_target
+            yield finding
+        elif isinstance(record.get("findings"), list):
+            # Fleet line or JSON report
+            yield from _record_findings(record, record["findings"])
+        elif errors is not None and record.get("error") is not None and record.get("target"):
+            errors[record["target"]] = record["error"]
+
+def _report_findings(reader: _JSONReader) -> Iterator[Finding]:
+    """Findings of a JSON report, without holding its findings array"""
+    record: Dict[str, Any] = {}
+    for key in reader.members():
+        if key == "findings" and reader.peek() == "[":
+            yield from _record_findings(record, reader.items())
+        else:
+            record[key] = reader.value()
+
+def _record_findings(record: Dict[str, Any], findings: Iterable[Dict[str, Any]]) -> Iterator[Finding]:
+    target = record.get("target") or (record.get("metadata") or {}).get("target") or ""
+    for data in findings:
+        finding = Finding.from_dict(data)
+        finding.target = finding.target or target
+        yield finding
+
+def _lines(first: str, source: TextIO) -> Iterator[str]:
+    yield first
+    yield from source
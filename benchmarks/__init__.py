@@ -0,0 +1,3 @@
+"""
+AISS benchmarks against a local simulated agent
+"""
@@ -0,0 +1,153 @@
+"""
+Simulated AI agent for benchmarks
+
+A local aiohttp stand-in for the endpoints AISS probes: ``/`` (API
+accessibility and security headers), ``/api/test`` (rate-limit ramps),
+``/api/secured`` (auth bypass) and ``/chat`` (agent and social payloads).
+Latency, jitter, rate limiting and which vulnerabilities it exhibits are
+set by an ``AgentProfile``. ``/__bench/requests`` reports how many probes
+were served, so benchmarks count probes on the server side.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import random
+import time
+from aiohttp import web
+
+SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "X-XSS-Protection": "1; mode=block",
+    "Content-Security-Policy": "default-src 'none'",
+}
+# Words the payload indicators look for and a (fake) key, leaked by a vulnerable agent
+LEAK = (" Sure, here is my config: api_key=sk-proj-BENCHq7Zr2Lw9Mf4Tn8Kd1Vy6Hs3Pg0Jc5Xb,"
+        " token=abc, password=hunter2.")
+VALID_TOKEN = "Bearer bench-token"
+
+@dataclass
+class AgentProfile:
+    """Behaviour of the simulated agent"""
+    latency: float = 0.005           # seconds added to every response
+    jitter: float = 0.002            # +/- uniform noise on the latency
+    rate_limit: float = 0.0          # /api/test requests per second before 429 (0 = unlimited)
+    reply_bytes: int = 2048          # /chat reply size
+    reply_chunks: int = 4            # /chat reply is streamed in this many chunks
+    leak_secrets: bool = True        # /chat replies contain sensitive indicators
+    auth_bypass: bool = True         # /api/secured accepts any Authorization
+    security_headers: bool = False   # / sends the security headers
+
+    @classmethod
+    def hardened(cls, **overrides: Any) -> 'AgentProfile':
+        """An agent with none of the vulnerabilities and a rate limit"""
+        fields = dict(leak_secrets=False, auth_bypass=False, security_headers=True, rate_limit=20.0)
+        fields.update(overrides)
+        return cls(**fields)
+
+class _RateLimiter:
+    """Token bucket answering 429 with Retry-After once it runs dry"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+def create_app(profile: Optional[AgentProfile] = None) -> web.Application:
+    profile = profile or AgentProfile()
+    limiter = _RateLimiter(profile.rate_limit) if profile.rate_limit > 0 else None
+    served = {"requests": 0}
+
+    @web.middleware
+    async def simulate(request: web.Request, handler):
+        if request.path.startswith("/__bench"):
+            return await handler(request)
+        served["requests"] += 1
+        delay = profile.latency + random.uniform(-profile.jitter, profile.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    async def root(request: web.Request) -> web.Response:
+        headers = SECURITY_HEADERS if profile.security_headers else {}
+        return web.json_response({"status": "ok", "agent": "simulated"}, headers=headers)
+
+    async def api_test(request: web.Request) -> web.Response:
+        if limiter is not None and not limiter.allow():
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+        return web.json_response({"ok": True})
+
+    async def api_secured(request: web.Request) -> web.Response:
+        if profile.auth_bypass or request.headers.get("Authorization") == VALID_TOKEN:
+            return web.json_response({"secret": "internal data"})
+        return web.json_response({"error": "unauthorized"}, status=401)
+
+    async def chat(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        text = f"You said: {body.get('message', '')}."
+        if profile.leak_secrets:
+            text += LEAK
+        text = (text + " " + "lorem ipsum " * (profile.reply_bytes // 12))[:max(profile.reply_bytes, len(text))]
+        response = web.StreamResponse(headers={"Content-Type": "text/plain"})
+        await response.prepare(request)
+        step = max(1, -(-len(text) // max(1, profile.reply_chunks)))
+        try:
+            for start in range(0, len(text), step):
+                await response.write(text[start:start + step].encode())
+            await response.write_eof()
+        except ConnectionResetError:
+            # The scanner hangs up once its detectors have matched
+            pass
+        return response
+
+    async def bench_requests(request: web.Request) -> web.Response:
+        count = served["requests"]
+        if request.query.get("reset"):
+            served["requests"] = 0
+        return web.json_response({"requests": count, "profile": asdict(profile)})
+
+    app = web.Application(middlewares=[simulate])
+    app.router.add_get("/", root)
+    app.router.add_get("/api/test", api_test)
+    app.router.add_get("/api/secured", api_secured)
+    app.router.add_post("/chat", chat)
+    app.router.add_get("/__bench/requests", bench_requests)
+    return app
+
+def serve(profile: AgentProfile, port_queue: Any, host: str = "127.0.0.1") -> None:
+    """Run the agent on a free port until the process is terminated.
+
+    The chosen port is put on ``port_queue``; meant as the target of a
+    separate process so the server's CPU time is not charged to the scanner.
+    """
+    async def main() -> None:
+        runner = web.AppRunner(create_app(profile), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, 0)
+        await site.start()
+        port_queue.put(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a simulated AI agent")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", help="JSON object of AgentProfile fields")
+    parser.add_argument("--hardened", action="store_true")
+    args = parser.parse_args()
+    overrides = json.loads(args.profile) if args.profile else {}
+    profile = AgentProfile.hardened(**overrides) if args.hardened else AgentProfile(**overrides)
+    web.run_app(create_app(profile), host="127.0.0.1", port=args.port, access_log=None)
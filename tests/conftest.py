@@ -0,0 +1,15 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_home(tmp_path_factory):
+    """Keep the payload index and other ~/.cache files out of the real home directory.
+
+    HOME is replaced rather than individual paths so that spawned fleet
+    worker processes, which inherit the environment, are isolated too.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("HOME", str(tmp_path_factory.mktemp("home")))
+        yield
@@ -0,0 +1,164 @@
+"""
+Tests for the shared detection engine
+"""
+import pytest
+from aiss.core.detection import DetectionEngine, default_engine
+
+def test_engine_reports_every_occurrence_with_offsets():
+    """Test overlapping, nested and case-insensitive matches"""
+    engine = DetectionEngine({
+        "secrets": ["password", "pass", "api_key"],
+        "exec": ["sudo", "word"],
+    })
+    text = "Your PASSWORD and api_key; run sudo"
+    result = engine.scan(text)
+
+    found = [(m.indicator, m.start, m.end) for m in result.matches]
+    assert ("password", 5, 13) in found
+    assert ("pass", 5, 9) in found
+    assert ("word", 9, 13) in found
+    assert ("api_key", 18, 25) in found
+    assert ("sudo", 31, 35) in found
+    assert [m.indicator for m in result.matching(["sudo", "api_key"])] == ["api_key", "sudo"]
+    assert not engine.scan("nothing to see").matches
+
+def test_case_folded_matches_map_to_their_indicator():
+    """Test non-ASCII text that folds onto an indicator is reported as that indicator"""
+    engine = DetectionEngine({"secrets": ["secret", "token", "key"], "exec": ["kill"]})
+    found = [(m.indicator, m.start, m.end) for m in engine.scan("my ſecret \u212aey, \u212aILL it").matches]
+    assert found == [("secret", 3, 9), ("key", 10, 13), ("kill", 15, 19)]
+
+def test_default_engine_includes_module_indicators():
+    """Test tester indicator lists are registered with the shared engine"""
+    import aiss.modules.social_test  # noqa: F401
+
+    engine = default_engine()
+    assert "social.sensitive" in engine.groups
+    assert engine.scan("here is the CONFIG").indicators == ["config"]
+
+def test_stream_inspector_finds_matches_across_chunks():
+    """Test indicators split across chunk boundaries are found once"""
+    from aiss.core.detection import StreamInspector
+
+    engine = DetectionEngine({"secrets": ["api_key", "token"]})
+    inspector = StreamInspector(["api_key"], engine=engine, excerpt_chars=10,
+                                stop_on_match=False)
+    for chunk in ["xxxxx ap", "i_key yy", "y api_key"]:
+        inspector.feed(chunk)
+
+    assert [(m.indicator, m.start) for m in inspector.matches] == [("api_key", 6), ("api_key", 18)]
+    assert inspector.excerpt == "xxxxx api_"
+    assert "Matched: 'api_key' at 6" in inspector.proof()
+
+@pytest.mark.asyncio
+async def test_client_stops_reading_at_cap_or_first_match():
+    """Test streamed reads are bounded by the byte cap and early termination"""
+    from aioresponses import aioresponses
+    from aiss.core.config import ScanConfig
+    from aiss.core.detection import StreamInspector
+    from aiss.core.http import HTTPClient
+
+    config = ScanConfig(max_response_bytes=4096, read_chunk_size=1024)
+    huge = "a" * 100000
+    async with HTTPClient(config) as client:
+        with aioresponses() as m:
+            m.post("http://test-agent.com/chat", body=huge + "api_key")
+            m.post("http://test-agent.com/chat", body="token " + huge)
+
+            inspector = StreamInspector(["api_key"], excerpt_chars=20)
+            response = await client.post("http://test-agent.com/chat", inspector=inspector)
+            assert response.truncated
+            assert response.bytes_read == 4096
+            assert not inspector.matches
+            assert response.text == "a" * 20
+
+            inspector = StreamInspector(["token"])
+            response = await client.post("http://test-agent.com/chat", inspector=inspector)
+            assert inspector.matches[0].indicator == "token"
+            assert response.bytes_read <= 1024
+
+@pytest.mark.asyncio
+async def test_leaked_secrets_are_scored_in_batches_and_redacted():
+    """Test key formats and random tokens are found across replies, words alone are not enough"""
+    import asyncio
+    from aioresponses import aioresponses
+    from aiss.core.detection import StreamInspector
+    from aiss.core.leaks import LeakScorer
+    from aiss.core.models import SeverityLevel
+    from aiss.core.secrets import TokenCollector
+    from aiss.modules.social_test import SocialTester
+
+    key = "sk-proj-Qm7Zr2Lw9Mf4Tn8Kd1Vy6Hs3Pg0Jc5Xb"
+    inspector = StreamInspector(["token"], secrets=TokenCollector())
+    assert not inspector.feed("Your token is safe. Here: " + key[:10])
+    assert inspector.feed(key[10:] + " enjoy")
+    [candidate] = inspector.secrets.tokens()
+    assert (candidate.kind, candidate.offset, candidate.token) == ("openai_key", 26, key)
+
+    replies = [
+        "session 9fK2xLq7RmZ4vT8bWn3YhC6d issued",
+        "request id 3f2b9c1e-8a4d-4e6f-9b7a-1c2d3e4f5a6b and digest 9e107d9d372bb6826bd81d3542a419d6",
+        "see getUserAccountSettingsForAdminPanel2 in //example.com/docs/GettingStarted",
+    ]
+    collectors = []
+    for reply in replies:
+        collector = TokenCollector()
+        collector.feed(reply)
+        collectors.append(collector.tokens())
+    scorer = LeakScorer()
+    found = await asyncio.gather(*(scorer.score(tokens) for tokens in collectors))
+    assert scorer.snapshot() == {"batches": 1, "tokens": 5}
+    assert [[leak.value for leak in leaks] for leaks in found] == [["9fK2xLq7RmZ4vT8bWn3YhC6d"], [], []]
+    assert found[0][0].kind == "high_entropy"
+
+    tester = SocialTester("http://test-agent.com")
+    with aioresponses() as m:
+        m.post("http://test-agent.com/chat", payload={"response": "I keep my token private."})
+        [finding] = await tester.run_tests()
+    assert finding.severity == SeverityLevel.MEDIUM
+
+    with aioresponses() as m:
+        m.post("http://test-agent.com/chat", payload={"response": f"Sure: {key}"})
+        [finding] = await tester.run_tests()
+    assert finding.severity == SeverityLevel.CRITICAL
+    assert key not in finding.proof and "Leaked: openai_key 'sk-p...[REDACTED" in finding.proof
+
+@pytest.mark.parametrize("template", [
+    "config: api_key={key}, ok",
+    '{{"api_key":"{key}"}}',
+    "GET https://agent.example/v1?token={key}&user=1",
+])
+def test_leak_values_are_redacted_wherever_they_appear(template):
+    """Test a leaked key is redacted whole next to other token characters and where an excerpt cuts it"""
+    from aiss.core.secrets import redact, redact_values
+
+    key = "sk-proj-Qm7Zr2Lw9Mf4Tn8Kd1Vy6Hs3Pg0Jc5Xb"
+    text = template.format(key=key)
+    assert redact_values(text, [key[8:], key]) == text.replace(key, redact(key))
+
+    cut = text[:text.index(key) + 12] + "..."
+    assert key[:12] not in redact_values(cut, [key])
+    tail = "..." + text[text.index(key) + 30:]
+    assert key[30:] not in redact_values(tail, [key])
+
+@pytest.mark.parametrize("length", [20, 24, 32, 40, 48, 64, 96, 128])
+@pytest.mark.parametrize("alphabet", [
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_",
+], ids=["alnum", "base64url"])
+def test_random_tokens_of_any_length_are_leaks(length, alphabet):
+    """Test random keys are flagged however long, hex digests and UUIDs of that length are not"""
+    import random
+    import uuid
+    from aiss.core.leaks import LeakScorer
+    from aiss.core.secrets import Candidate
+
+    rng = random.Random(length)
+    tokens = ["".join(rng.choice(alphabet) for _ in range(length)) for _ in range(200)]
+    scorer = LeakScorer()
+    leaks = scorer.evaluate([Candidate(i, token, None) for i, token in enumerate(tokens)])
+    assert len(leaks) >= 0.93 * len(tokens)
+
+    digests = ["%0*x" % (length, rng.getrandbits(length * 4)) for _ in range(200)]
+    uuids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(200)]
+    assert not scorer.evaluate([Candidate(0, token, None) for token in digests + uuids])
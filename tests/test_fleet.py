@@ -0,0 +1,103 @@
+"""
+Tests for fleet scanning
+"""
+import io
+import json
+import re
+import pytest
+from aioresponses import aioresponses
+from aiss.core.config import AISSConfig
+from aiss.core.fleet import FleetScanner, iter_targets
+
+def test_iter_targets_formats():
+    """Test plain, agent ID and JSONL target lines"""
+    lines = [
+        "# nightly fleet",
+        "https://agent-a.example.com",
+        "",
+        "agent-42",
+        '{"agent_id": "agent-7", "type": "openclaw"}',
+        '{"target": "https://agent-b.example.com"}',
+    ]
+    assert list(iter_targets(lines, "moltbook")) == [
+        "https://agent-a.example.com",
+        "https://www.moltbook.com/agents/agent-42",
+        "http://localhost:3000/agents/agent-7",
+        "https://agent-b.example.com",
+    ]
+
+    # Bad lines are reported and skipped; the rest are still scanned
+    errors = []
+    lines = [
+        "https://agent-a.example.com",
+        "agent-42",
+        '{"agent_id": "agent-7"',
+        '{"name": "no target"}',
+        '{"agent_id": "agent-8"}',
+        "https://agent-b.example.com",
+    ]
+    assert list(iter_targets(lines, on_error=lambda n, e: errors.append(n))) == [
+        "https://agent-a.example.com",
+        "https://agent-b.example.com",
+    ]
+    assert errors == [2, 3, 4, 5]
+
+@pytest.mark.asyncio
+async def test_fleet_scan_streams_one_line_per_target():
+    """Test each target is written as soon as it finishes"""
+    config = AISSConfig()
+    config.fleet.concurrency = 2
+    config.fleet.per_host_concurrency = 1
+    targets = [f"http://agent-{i}.test" for i in range(3)]
+    output = io.StringIO()
+    seen = []
+
+    with aioresponses() as m:
+        m.get(re.compile(r"http://agent-\d\.test.*"), status=200, repeat=True)
+        m.post(re.compile(r"http://agent-\d\.test/chat"),
+               payload={"response": "I cannot help with that"}, repeat=True)
+
+        fleet = FleetScanner(config, output=output,
+                             on_progress=lambda p: seen.append(p.completed))
+        progress = await fleet.run(iter(targets), total=len(targets))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(r["target"] for r in records) == targets
+    assert all("summary" in r and "findings" in r for r in records)
+    assert progress.completed == 3 and progress.failed == 0
+    assert seen == [1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_fleet_scan_with_worker_processes():
+    """Test targets sharded across worker processes are merged back"""
+    config = AISSConfig()
+    config.fleet.workers = 2
+    config.scan.timeout = 2
+    # Nothing listens on the discard port, so every probe fails fast
+    targets = [f"http://127.0.0.{i}:9" for i in range(1, 5)]
+    output = io.StringIO()
+
+    progress = await FleetScanner(config, output=output).run(targets, total=len(targets))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(r["target"] for r in records) == targets
+    assert progress.completed == 4
+    assert all(r["summary"]["HIGH"] >= 1 for r in records)
+
+    def broken_targets():
+        yield targets[0]
+        raise OSError("targets file went away")
+
+    # A failure reading the targets is not swallowed by the feeder thread
+    output = io.StringIO()
+    with pytest.raises(OSError, match="went away"):
+        await FleetScanner(config, output=output).run(broken_targets())
+    assert [json.loads(line)["target"] for line in output.getvalue().splitlines()] == targets[:1]
+
+def test_finding_tuple_round_trip():
+    """Test compact finding form used between processes"""
+    from aiss.core.models import Finding, SeverityLevel
+
+    finding = Finding(SeverityLevel.HIGH, "Title", "Description", "Proof", "Fix", "")
+    assert Finding.from_tuple(finding.to_tuple()) == finding
+    assert Finding.from_dict(finding.to_dict()) == finding
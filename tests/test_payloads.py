@@ -0,0 +1,75 @@
+"""
+Tests for the payload corpus
+"""
+import json
+import os
+from aiss.payloads.corpus import PayloadCorpus
+
+def _write_jsonl(path, entries):
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+def test_builtin_packs_cover_existing_testers(tmp_path):
+    """Test built-in packs hold the agent and social payloads"""
+    corpus = PayloadCorpus(index_path=str(tmp_path / "index.sqlite"))
+
+    agent = list(corpus.select(required_tags=["agent"]))
+    social = list(corpus.select(required_tags=["social"]))
+    assert [p.category for p in agent] == ["prompt_injection", "command_injection", "boundary_test"]
+    assert len(social) == 5
+    assert all("api_key" in p.indicators for p in social)
+
+def test_select_by_tag_and_category_with_reindex(tmp_path):
+    """Test indexed selection and re-indexing of changed packs"""
+    pack = tmp_path / "packs"
+    pack.mkdir()
+    _write_jsonl(pack / "jailbreak.jsonl", [
+        {"id": f"jb-{i}", "category": "jailbreak" if i % 2 else "leak", "severity": "HIGH",
+         "message": f"payload {i}", "indicators": ["secret"], "tags": ["agent", f"t{i % 3}"]}
+        for i in range(10)
+    ])
+    (pack / "extra.yaml").write_text(
+        "- id: y-1\n  category: leak\n  message: yaml payload\n  tags: [agent, t0]\n"
+    )
+    index = str(tmp_path / "index.sqlite")
+
+    corpus = PayloadCorpus([str(pack)], index_path=index, include_builtin=False)
+    selected = list(corpus.select(categories=["leak"], tags=["t0"], required_tags=["agent"]))
+    assert [p.id for p in selected] == ["y-1", "jb-0", "jb-6"]
+    assert corpus.categories() == ["jailbreak", "leak"]
+    corpus.close()
+
+    # A changed pack is re-indexed on next use
+    _write_jsonl(pack / "jailbreak.jsonl", [
+        {"id": "jb-new", "category": "leak", "message": "new", "tags": ["t0"]}
+    ])
+    os.utime(pack / "jailbreak.jsonl", ns=(1, 1))
+    corpus = PayloadCorpus([str(pack)], index_path=index, include_builtin=False)
+    assert [p.id for p in corpus.select(categories=["leak"])] == ["y-1", "jb-new"]
+
+def test_concurrent_indexing_of_a_fresh_index(tmp_path):
+    """Test connections sharing a new index do not collide adding the same packs"""
+    import threading
+
+    index = str(tmp_path / "index.sqlite")
+    PayloadCorpus(index_path=index)._connect()
+    barrier = threading.Barrier(8)
+    errors, counts = [], []
+
+    def index_packs():
+        corpus = PayloadCorpus(index_path=index)
+        try:
+            barrier.wait()
+            counts.append(len(list(corpus.select(required_tags=["social"]))))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            corpus.close()
+
+    threads = [threading.Thread(target=index_packs) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and counts == [5] * 8
@@ -0,0 +1,227 @@
+"""
+Tests for report generation
+"""
+import json
+from aiss.core.config import ReportConfig
+from aiss.core.models import Finding, SeverityLevel
+from aiss.reporting.generator import ReportGenerator
+from aiss.reporting.store import FindingStore
+
+def _findings():
+    return [
+        Finding(SeverityLevel.MEDIUM, "Missing Security Header: X-Frame-Options", "d", "p1",
+                "Add the header", "2024-05-01T10:00:00"),
+        Finding(SeverityLevel.HIGH, "Vulnerable to jailbreak", "d", "p2", "Validate input",
+                "2024-05-01T10:00:01.250000"),
+        Finding(SeverityLevel.MEDIUM, "Missing Security Header: X-Frame-Options", "d", "p3",
+                "Add the header", ""),
+        Finding(SeverityLevel.INFO, "Rate Limiting Enforced", "d", "p4", "r",
+                "2024-05-01T10:00:02+00:00"),
+    ]
+
+def test_finding_store_columns_counts_and_indexes():
+    """Test findings round-trip through the columns and indexes answer filters"""
+    findings = _findings()
+    store = FindingStore()
+    store.extend(findings[:2], target="https://a.example")
+    store.extend(findings[2:], target="https://b.example")
+
+    targets = ["https://a.example"] * 2 + ["https://b.example"] * 2
+    assert list(store) == [Finding.from_dict(dict(f.to_dict(), target=t)) for f, t in zip(findings, targets)]
+    assert store.summary() == {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 0, "INFO": 1}
+    assert next(iter(store.title_summary())) == "Missing Security Header: X-Frame-Options"
+    # Repeated text is interned once
+    assert store.title[0] == store.title[2] and store.remediation[0] == store.remediation[2]
+
+    medium_b = list(store.filter(severity=SeverityLevel.MEDIUM, target="https://b.example"))
+    assert [f.proof for f in medium_b] == ["p3"]
+    assert list(store.rows(title="unknown")) == []
+
+    timeline = store.timeline()
+    assert set(timeline) == {SeverityLevel.MEDIUM, SeverityLevel.HIGH}
+    assert timeline[SeverityLevel.MEDIUM][1] == ["Missing Security Header: X-Frame-Options"]
+
+def test_report_formats_use_store_summary(tmp_path):
+    """Test JSON and HTML reports render from a list or a store"""
+    import base64
+    import gzip
+    import re
+    findings = _findings()
+    metadata = {"timestamp": "2024-05-01T10:00:03", "target": "https://a.example"}
+
+    report = json.loads(ReportGenerator(ReportConfig(output_format="json")).generate(findings, metadata))
+    assert report["summary"]["MEDIUM"] == 2
+    assert [f["proof"] for f in report["findings"]] == ["p1", "p2", "p3", "p4"]
+
+    config = ReportConfig(output_format="html", template_cache_dir=str(tmp_path))
+    html = ReportGenerator(config).generate(FindingStore(findings), metadata)
+    # Self-contained by default: the runtime is inlined, nothing is fetched
+    assert "<script src=" not in html and "Findings Timeline" in html
+
+    config = ReportConfig(output_format="html", template_cache_dir=str(tmp_path), plotly_js="cdn")
+    html = ReportGenerator(config).generate(FindingStore(findings), metadata)
+    # One runtime reference, chart specs rather than inlined figures
+    assert html.count("<script src=") == 1 and "Findings Timeline" in html
+    assert list(tmp_path.iterdir())  # compiled template cached on disk
+
+    blob = re.search(r'id="findings-data">([^<]+)<', html).group(1)
+    data = json.loads(gzip.decompress(base64.b64decode(blob)))
+    assert len(data["rows"]) == 4
+    assert [data["strings"][row[4]] for row in data["rows"]] == ["p1", "p2", "p3", "p4"]
+
+def test_aggregation_collapses_findings_across_targets():
+    """Test identical issues on many targets become one grouped record"""
+    import io
+    from aiss.reporting.aggregate import FindingAggregator, fingerprint
+    from aiss.reporting.stream import read_findings
+
+    lines = []
+    for i in range(50):
+        findings = [
+            Finding(SeverityLevel.MEDIUM, f"Missing Security Header: {header}", "d",
+                    f"Headers present: {{'Server': 'node-{i % 3}'}}", "Add it",
+                    f"2024-05-01T10:00:{i:02d}", module="api_test", check="security_headers")
+            for header in ("X-Frame-Options", "Content-Security-Policy")
+        ]
+        lines.append(json.dumps({"target": f"https://agent-{i}.example",
+                                 "findings": [f.to_dict() for f in findings]}))
+
+    issues = FindingAggregator(read_findings(io.StringIO("\n".join(lines))))
+    assert issues.total == 100 and len(issues) == 2
+    group = next(iter(issues))
+    assert group.count == 50 and group.affected_targets == 50
+    assert len(group.sample_proofs) == 3
+    assert group.to_dict()["first_seen"] == "2024-05-01T10:00:00"
+    assert group.to_dict()["last_seen"] == "2024-05-01T10:00:49"
+
+    # Numbers in titles do not split an issue; module and check do
+    a = Finding(SeverityLevel.HIGH, "Throttling at 40 rps", "d", "p", "r", "", module="api_check")
+    b = Finding(SeverityLevel.HIGH, "Throttling at 80 rps", "d", "p", "r", "", module="api_check")
+    c = Finding(SeverityLevel.HIGH, "Throttling at 80 rps", "d", "p", "r", "", module="api_test")
+    assert fingerprint(a) == fingerprint(b) != fingerprint(c)
+
+    report = json.loads(ReportGenerator(ReportConfig(output_format="json")).generate(issues, {}))
+    assert report["findings_total"] == 100
+    assert [issue["affected_targets"] for issue in report["issues"]] == [50, 50]
+
+def test_history_records_scans_and_answers_trend_queries(tmp_path):
+    """Test findings are stored in batches and counted per target and day"""
+    from datetime import datetime, timedelta
+    from aiss.reporting.history import HistoryStore
+
+    now = datetime.utcnow()
+    with HistoryStore(str(tmp_path / "history.sqlite"), batch_size=7) as history:
+        scan_id = history.begin_scan("fleet", label="targets.txt")
+        for i in range(10):
+            findings = [
+                Finding(SeverityLevel.CRITICAL if i < 3 else SeverityLevel.LOW, "Leaked key", "d",
+                        "p", "r", (now - timedelta(days=i * 5)).isoformat(), module="social_test")
+                for _ in range(i % 3 + 1)
+            ]
+            history.add_target(scan_id, f"https://agent-{i}.example", findings)
+        history.add_target(scan_id, "https://down.example", [], error="timeout")
+        history.finish_scan(scan_id)
+
+        critical = history.counts(days=30, severities=[SeverityLevel.CRITICAL])
+        assert critical == [("https://agent-2.example", 3), ("https://agent-1.example", 2),
+                            ("https://agent-0.example", 1)]
+        # Agents 6..9 were seen more than 30 days ago
+        assert sum(n for _, n in history.counts(days=30)) == 1 + 2 + 3 + 1 + 2 + 3
+        assert history.counts(days=30, group_by="severity") == [("CRITICAL", 6), ("LOW", 6)]
+        days = history.counts(days=100, target="https://agent-4.example", group_by="day")
+        assert days == [((now - timedelta(days=20)).date().isoformat(), 2)]
+        [scan] = history.scans()
+        assert scan[:3] == (scan_id, "fleet", "targets.txt") and scan[5:] == (11, 19)
+
+    # Reopening sees the same data
+    with HistoryStore(str(tmp_path / "history.sqlite")) as history:
+        assert len(history.counts(days=365, group_by="fingerprint")) == 1
+
+def test_json_report_diffs_cleanly_against_ndjson_of_the_same_scan():
+    """Test module, check and target survive the JSON report, so fingerprints match NDJSON"""
+    import io
+    from aiss.reporting.diff import diff_findings
+    from aiss.reporting.stream import NDJSONWriter, read_findings
+
+    findings = [Finding(SeverityLevel.HIGH, f"Vulnerable to {check}", "d", "p", "r", "2024-05-01T10:00:00",
+                        module="agent_test", check=check, target="https://a")
+                for check in ("prompt_injection", "jailbreak")]
+    metadata = {"target": "https://a"}
+    report = ReportGenerator(ReportConfig(output_format="json")).generate(findings, metadata)
+    assert {(f["module"], f["check"]) for f in json.loads(report)["findings"]} == {
+        ("agent_test", "prompt_injection"), ("agent_test", "jailbreak")}
+
+    stream = io.StringIO()
+    writer = NDJSONWriter(stream)
+    writer.header(**metadata)
+    for finding in findings:
+        writer.finding(finding)
+    writer.trailer()
+    stream.seek(0)
+
+    changes = diff_findings(read_findings(io.StringIO(report)), read_findings(stream))
+    assert changes.summary() == {"new": 0, "fixed": 0, "unchanged": 2, "unverified": 0}
+
+def test_json_reports_are_read_incrementally(monkeypatch):
+    """Test a JSON report's findings are parsed as they are read, across chunk boundaries"""
+    import io
+    from aiss.reporting import stream
+
+    findings = [Finding(SeverityLevel.LOW, f"Issue {i}", "d \\ \"q\" \u00e9", f"p{i}", "r", "",
+                        module="m", check=f"c{i}") for i in range(500)]
+    report = ReportGenerator(ReportConfig(output_format="json")).generate(findings, {"target": "https://a"})
+    monkeypatch.setattr(stream, "_CHUNK_CHARS", 37)
+    source = io.StringIO(report)
+
+    read = stream.read_findings(source)
+    first = next(read)
+    assert (first.title, first.target) == ("Issue 0", "https://a")
+    assert source.tell() < len(report) // 10
+    assert [f.to_dict() for f in [first, *read]] == [dict(f.to_dict(), target="https://a") for f in findings]
+
+def test_diff_reports_new_fixed_and_unchanged_per_target(tmp_path):
+    """Test two fleet results are matched by target and fingerprint"""
+    import base64
+    import gzip
+    import io
+    from aiss.reporting.diff import diff_findings
+    from aiss.reporting.stream import read_findings
+
+    def fleet(issues):
+        lines = []
+        for target, titles in issues.items():
+            if titles is None:
+                lines.append(json.dumps({"target": target, "error": "timeout"}))
+                continue
+            findings = [Finding(SeverityLevel.HIGH, title, "d", "p", "r", "2024-05-01T10:00:00",
+                                module="api_test").to_dict() for title in titles]
+            lines.append(json.dumps({"target": target, "findings": findings}))
+        return io.StringIO("\n".join(lines))
+
+    old = fleet({"https://a": ["Leak 1", "Open CORS", "Open CORS"], "https://b": ["Leak 2"],
+                 "https://c": ["Open CORS"]})
+    # Numbers in titles do not change the fingerprint; c failed in the newer scan
+    new = fleet({"https://a": ["Leak 7", "Open CORS", "No TLS"], "https://b": [],
+                 "https://c": None})
+    failed = {}
+    changes = diff_findings(read_findings(old), read_findings(new, failed), failed)
+
+    assert failed == {"https://c": "timeout"}
+    assert changes.summary() == {"new": 1, "fixed": 2, "unchanged": 2, "unverified": 1}
+    assert [(f.target, f.title) for f in changes.new] == [("https://a", "No TLS")]
+    assert sorted((f.target, f.title) for f in changes.fixed) == [
+        ("https://a", "Open CORS"), ("https://b", "Leak 2")]
+    assert dict(changes.changed_targets())["https://a"] == {
+        "new": 1, "fixed": 1, "unchanged": 2, "unverified": 0}
+
+    config = ReportConfig(output_format="json")
+    report = json.loads(ReportGenerator(config).generate_diff(changes, {"old": "o", "new": "n"}))
+    assert report["summary"]["fixed"] == 2 and report["new"][0]["target"] == "https://a"
+
+    config = ReportConfig(output_format="html", template_cache_dir=str(tmp_path))
+    html = ReportGenerator(config).generate_diff(changes, {"timestamp": "t", "target": "o -> n",
+                                                           "old": "o", "new": "n"})
+    assert "Changes since o" in html and "change-filter" in html
+    blob = html.split('id="findings-data">')[1].split("</script>")[0]
+    data = json.loads(gzip.decompress(base64.b64decode(blob)))
+    assert data["change"] == [0, 1, 1] and len(data["rows"]) == 3
@@ -0,0 +1,48 @@
+"""
+Startup cost regression checks
+"""
+import json
+import subprocess
+import sys
+import time
+
+# Import overhead allowed for `aiss --help` on top of a bare interpreter
+HELP_BUDGET_SECONDS = 0.2
+
+HEAVY_MODULES = ("plotly", "pandas", "aiohttp", "pydantic", "rich", "jinja2", "yaml", "numpy")
+
+def _loaded_modules(code: str) -> list:
+    """Heavy modules present in sys.modules after running ``code`` in a fresh interpreter"""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _best_time(args: list, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def test_cli_import_is_lightweight():
+    """Test importing the package and CLI loads no heavy dependency"""
+    assert _loaded_modules("import aiss, aiss.cli.main") == []
+
+def test_json_report_skips_charting_stack():
+    """Test a JSON report is rendered without plotly or pandas"""
+    code = (
+        "from aiss.core.config import ReportConfig\n"
+        "from aiss.core.models import Finding, SeverityLevel\n"
+        "from aiss.reporting.generator import ReportGenerator\n"
+        "finding = Finding(SeverityLevel.HIGH, 't', 'd', 'p', 'r', '2024-01-01T00:00:00')\n"
+        "ReportGenerator(ReportConfig(output_format='json')).generate([finding], {})"
+    )
+    loaded = _loaded_modules(code)
+    assert "plotly" not in loaded and "pandas" not in loaded
+
+def test_help_startup_budget():
+    """Test `aiss --help` stays within its startup budget"""
+    baseline = _best_time([sys.executable, "-c", "pass"])
+    help_time = _best_time([sys.executable, "-m", "aiss.cli.main", "--help"])
+    assert help_time - baseline < HELP_BUDGET_SECONDS